@@ -1,10 +1,113 @@
+from contextlib import contextmanager
+
+# Value types a bot variable may hold. Anything else is stored as its str().
+VALUE_TYPES = (str, int, float, bool, type(None), list, dict)
+
+DEFAULT_MAX_VARS = 1024
+DEFAULT_MAX_FRAMES = 32
+DEFAULT_MAX_VALUE_LENGTH = 64 * 1024
+
+
 class Context:
-    def __init__(self):
-        self.variables = {}
+    """
+    Bounded variable store shared by actions, conditions and templates.
+
+    Variables live in a stack of scoped frames: lookups walk from the innermost
+    frame outwards. Writes update the innermost frame that already defines the
+    key, otherwise the bot-wide bottom frame (which is never popped), so values
+    extracted inside a scoped state outlive it. Frames are opened per state
+    from its "with_vars" field.
+    """
+    __slots__ = ("_frames", "_count", "max_vars", "max_frames", "max_value_length", "data")
+
+    def __init__(self, variables=None, max_vars=DEFAULT_MAX_VARS, max_frames=DEFAULT_MAX_FRAMES,
+                 max_value_length=DEFAULT_MAX_VALUE_LENGTH):
+        self._frames = [{}]
+        self._count = 0
+        self.max_vars = max_vars
+        self.max_frames = max_frames
+        self.max_value_length = max_value_length
         self.data = {}
+        for key, value in (variables or {}).items():
+            self.set(key, value)
+
+    # -------------------- Values --------------------
+    def _coerce(self, value):
+        if not isinstance(value, VALUE_TYPES):
+            value = str(value)
+        if isinstance(value, str) and len(value) > self.max_value_length:
+            value = value[:self.max_value_length]
+        return value
+
+    def _assign(self, frame, key, value):
+        if key not in frame:
+            if self._count >= self.max_vars:
+                raise ValueError(f"Context is full ({self.max_vars} variables), cannot set '{key}'")
+            self._count += 1
+        frame[key] = self._coerce(value)
 
     def set(self, key, value):
-        self.variables[key] = value
+        for frame in reversed(self._frames):
+            if key in frame:
+                break
+        else:
+            frame = self._frames[0]
+        self._assign(frame, key, value)
 
     def get(self, key, default=None):
-        return self.variables.get(key, default)
\ No newline at end of file
+        for frame in reversed(self._frames):
+            if key in frame:
+                return frame[key]
+        return default
+
+    def delete(self, key):
+        for frame in reversed(self._frames):
+            if key in frame:
+                del frame[key]
+                self._count -= 1
+                return
+
+    def __getitem__(self, key):
+        for frame in reversed(self._frames):
+            if key in frame:
+                return frame[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __contains__(self, key):
+        return any(key in frame for frame in self._frames)
+
+    def __len__(self):
+        return len(self.variables)
+
+    @property
+    def variables(self):
+        """Flattened view of all visible variables (inner frames win)."""
+        merged = {}
+        for frame in self._frames:
+            merged.update(frame)
+        return merged
+
+    # -------------------- Frames --------------------
+    def push_frame(self, variables=None):
+        if len(self._frames) >= self.max_frames:
+            raise ValueError(f"Context frame limit ({self.max_frames}) reached")
+        frame = {}
+        self._frames.append(frame)
+        for key, value in (variables or {}).items():
+            self._assign(frame, key, value)
+
+    def pop_frame(self):
+        if len(self._frames) == 1:
+            raise ValueError("Cannot pop the bot-wide context frame")
+        self._count -= len(self._frames.pop())
+
+    @contextmanager
+    def frame(self, variables=None):
+        self.push_frame(variables)
+        try:
+            yield self
+        finally:
+            self.pop_frame()
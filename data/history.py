@@ -0,0 +1,300 @@
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_HISTORY_DB = Path("data") / "history.db"
+LEGACY_LOGS_FILE = Path("data") / "logs.json"
+
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_MAX_RUNS_PER_BOT = 1000
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+# Run-history writes from bot event loops go through one background thread: SQLite may wait
+# on another process's lock (worker mode), and a single thread keeps log batches in order.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-history")
+
+
+async def run_in_writer(func, *args):
+    """Await func(*args) on the run-history writer thread."""
+    return await asyncio.wrap_future(_writer.submit(func, *args))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    bot_name        TEXT NOT NULL,
+    job_id          INTEGER,
+    status          TEXT NOT NULL DEFAULT 'running',
+    started_at      REAL NOT NULL,
+    finished_at     REAL,
+    states_executed INTEGER NOT NULL DEFAULT 0,
+    error           TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_bot ON runs(bot_name, id);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+
+CREATE TABLE IF NOT EXISTS logs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id   INTEGER,
+    bot_name TEXT,
+    ts       REAL NOT NULL,
+    level    TEXT NOT NULL,
+    message  TEXT NOT NULL,
+    data     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_logs_run ON logs(run_id, id);
+CREATE INDEX IF NOT EXISTS idx_logs_bot ON logs(bot_name, id);
+CREATE INDEX IF NOT EXISTS idx_logs_level ON logs(level, id);
+CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs(ts);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+LEGACY_IMPORT_KEY = "legacy_logs_imported"
+
+
+class RunHistory:
+    """
+    Append-only run history and log store (SQLite, WAL).
+
+    Rows are only ever inserted (runs are updated once when they finish), so
+    writers never rewrite existing data, and every query is served from an
+    index with keyset pagination (`before` = last id of the previous page).
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_HISTORY_DB
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _execute(self, sql, params=()):
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params)
+        finally:
+            conn.close()
+
+    def _query(self, sql, params=()):
+        conn = self._connect()
+        try:
+            return [dict(r) for r in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+    # -------------------- Runs --------------------
+    def start_run(self, bot_name: str, job_id: int = None) -> int:
+        return self._execute(
+            "INSERT INTO runs (bot_name, job_id, started_at) VALUES (?, ?, ?)",
+            (bot_name, job_id, time.time()),
+        ).lastrowid
+
+    def finish_run(self, run_id: int, status: str, states_executed: int = 0, error: str = None):
+        self._execute(
+            "UPDATE runs SET status = ?, finished_at = ?, states_executed = ?, error = ? WHERE id = ?",
+            (status, time.time(), states_executed, error, run_id),
+        )
+
+    def get_run(self, run_id: int):
+        rows = self._query("SELECT * FROM runs WHERE id = ?", (run_id,))
+        return rows[0] if rows else None
+
+    def list_runs(self, bot_name: str = None, status: str = None, since: float = None, until: float = None,
+                  limit: int = 50, before: int = None):
+        clauses, params = _filters(bot_name=bot_name, status=status, before=before)
+        if since:
+            clauses.append("started_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("started_at < ?")
+            params.append(until)
+        return self._query(
+            f"SELECT * FROM runs {_where(clauses)} ORDER BY id DESC LIMIT ?", (*params, limit)
+        )
+
+    # -------------------- Logs --------------------
+    def append_logs(self, entries):
+        """entries: iterable of (run_id, bot_name, ts, level, message, data)"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO logs (run_id, bot_name, ts, level, message, data) VALUES (?, ?, ?, ?, ?, ?)",
+                [(r, b, ts, lvl, msg, json.dumps(d) if d else None) for r, b, ts, lvl, msg, d in entries],
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def query_logs(self, bot_name: str = None, run_id: int = None, level: str = None, since: float = None,
+                   until: float = None, limit: int = 100, before: int = None):
+        clauses, params = _filters(bot_name=bot_name, run_id=run_id, level=level, before=before)
+        if since:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until:
+            clauses.append("ts < ?")
+            params.append(until)
+        rows = self._query(
+            f"SELECT * FROM logs {_where(clauses)} ORDER BY id DESC LIMIT ?", (*params, limit)
+        )
+        for row in rows:
+            row["data"] = json.loads(row["data"]) if row["data"] else {}
+        return rows
+
+    # -------------------- Retention --------------------
+    def prune(self, retention_days: float = DEFAULT_RETENTION_DAYS, max_runs_per_bot: int = DEFAULT_MAX_RUNS_PER_BOT):
+        """
+        Drop runs (and their logs) older than retention_days or beyond the newest
+        max_runs_per_bot per bot. Imported legacy entries (no run) and runs
+        still in progress (e.g. paused for days) are kept.
+        """
+        cutoff = time.time() - retention_days * 86400
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                """
+                DELETE FROM runs WHERE status != 'running' AND (started_at < ? OR id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (PARTITION BY bot_name ORDER BY id DESC) AS rn FROM runs
+                    ) WHERE rn > ?
+                ))
+                """,
+                (cutoff, max_runs_per_bot),
+            )
+            conn.execute(
+                """
+                DELETE FROM logs WHERE run_id IS NOT NULL AND (
+                    run_id NOT IN (SELECT id FROM runs)
+                    OR (ts < ? AND run_id NOT IN (SELECT id FROM runs WHERE status = 'running'))
+                )
+                """,
+                (cutoff,),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def import_legacy_logs(self, path=LEGACY_LOGS_FILE) -> int:
+        """One-time import of the old data/logs.json array; the import is recorded in the meta table."""
+        path = Path(path)
+        if not path.exists():
+            return 0
+        if self._query("SELECT 1 FROM meta WHERE key = ?", (LEGACY_IMPORT_KEY,)):
+            return 0
+        with open(path, "r") as f:
+            entries = json.load(f)
+        rows = []
+        for e in entries:
+            ts = _parse_timestamp(e.get("timestamp"))
+            data = e.get("data")
+            rows.append((None, e.get("module"), ts, e.get("level", "INFO"), e.get("message", ""),
+                         json.dumps(data) if data else None))
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Re-check inside the write lock so two processes starting together import once
+            if conn.execute("SELECT 1 FROM meta WHERE key = ?", (LEGACY_IMPORT_KEY,)).fetchone():
+                conn.execute("ROLLBACK")
+                return 0
+            conn.executemany(
+                "INSERT INTO logs (run_id, bot_name, ts, level, message, data) VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                (LEGACY_IMPORT_KEY, json.dumps({"path": str(path), "entries": len(rows), "at": time.time()})),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return len(rows)
+
+
+class RunLogger:
+    """
+    Per-run log writer. Entries are buffered and written in one transaction
+    every `flush_every` entries / `flush_interval` seconds and on close(), on
+    the writer thread so logging never blocks the bot's event loop.
+    With history=None it only counts states (used when run_bot runs standalone).
+    """
+
+    def __init__(self, history: RunHistory, run_id: int, bot_name: str, flush_every: int = 50,
+                 flush_interval: float = 2.0):
+        self.history = history
+        self.run_id = run_id
+        self.bot_name = bot_name
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.states_executed = 0
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def log(self, level: str, message: str, **data):
+        self._buffer.append((self.run_id, self.bot_name, time.time(), level, message, data))
+        if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush > self.flush_interval:
+            self.flush()
+
+    def info(self, message: str, **data):
+        self.log("INFO", message, **data)
+
+    def warning(self, message: str, **data):
+        self.log("WARNING", message, **data)
+
+    def error(self, message: str, **data):
+        self.log("ERROR", message, **data)
+
+    def flush(self):
+        if self._buffer and self.history is not None:
+            buffer, self._buffer = self._buffer, []
+            _writer.submit(self._write, buffer)
+        self._last_flush = time.monotonic()
+
+    def _write(self, buffer):
+        try:
+            self.history.append_logs(buffer)
+        except Exception as e:
+            print(f"⚠️ Failed to write run logs: {e}")
+
+    async def close(self, status: str, error: str = None):
+        self.flush()
+        if self.history is not None:
+            # Queued behind the pending log batches on the same writer thread
+            await run_in_writer(self.history.finish_run, self.run_id, status, self.states_executed, error)
+
+
+def _filters(**kwargs):
+    columns = {"bot_name": "bot_name = ?", "status": "status = ?", "run_id": "run_id = ?",
+               "level": "level = ?", "before": "id < ?"}
+    clauses, params = [], []
+    for key, value in kwargs.items():
+        if value is not None and value != "":
+            clauses.append(columns[key])
+            params.append(value)
+    return clauses, params
+
+
+def _where(clauses):
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def _parse_timestamp(value):
+    from datetime import datetime
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
@@ -0,0 +1,221 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+DEFAULT_SEEN_DB = Path("data") / "seen.db"
+
+BLOOM_BITS_PER_ITEM = 10   # ~1% false positives with 7 hashes
+BLOOM_HASHES = 7
+BLOOM_MIN_BITS = 1 << 16
+SQL_IN_CHUNK = 500         # hashes per "IN (...)" lookup, well under SQLite's variable limit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    namespace  TEXT NOT NULL,
+    key_hash   INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen  REAL NOT NULL,
+    PRIMARY KEY (namespace, key_hash)
+) WITHOUT ROWID;
+"""
+
+
+def key_hash(key) -> int:
+    """Stable signed 64-bit hash of an item URL / id (fits an SQLite INTEGER)."""
+    digest = hashlib.blake2b(str(key).strip().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _key_hashes(keys) -> set:
+    """Hashes of one key or an iterable of keys, skipping empty ones (ids may be numbers)."""
+    if isinstance(keys, (str, int)):
+        keys = [keys]
+    return {key_hash(k) for k in keys if k is not None and str(k).strip()}
+
+
+class BloomFilter:
+    __slots__ = ("size", "bits")
+
+    def __init__(self, capacity: int):
+        self.size = max(BLOOM_MIN_BITS, capacity * BLOOM_BITS_PER_ITEM)
+        self.bits = bytearray(self.size // 8 + 1)
+
+    def _positions(self, h: int):
+        # Double hashing from the two 32-bit halves of the 64-bit key hash
+        h &= 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h >> 32, (h & 0xFFFFFFFF) | 1
+        return [(h1 + i * h2) % self.size for i in range(BLOOM_HASHES)]
+
+    def add(self, h: int):
+        for p in self._positions(h):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, h: int) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(h))
+
+
+class SeenIndex:
+    """
+    Persistent "already processed" set per namespace (usually the bot name).
+
+    Items are stored as 64-bit hashes in SQLite (exact answer); an in-memory
+    Bloom filter per namespace answers most "not seen" lookups without
+    touching the database. Filters only learn about this process's marks, so
+    they are rebuilt from the database at the start of every run (refresh()).
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_SEEN_DB
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._filters = {}
+        self._lock = threading.Lock()
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+
+    def _filter(self, namespace: str) -> BloomFilter:
+        with self._lock:
+            bloom = self._filters.get(namespace)
+            if bloom is None:
+                conn = self._connect()
+                try:
+                    count = conn.execute("SELECT COUNT(*) FROM seen WHERE namespace = ?", (namespace,)).fetchone()[0]
+                    bloom = BloomFilter(max(count * 2, 1))
+                    for (h,) in conn.execute("SELECT key_hash FROM seen WHERE namespace = ?", (namespace,)):
+                        bloom.add(h)
+                finally:
+                    conn.close()
+                self._filters[namespace] = bloom
+            return bloom
+
+    def refresh(self, namespace: str = None):
+        """Drop cached filters (one namespace or all) so they are reloaded with other processes' marks."""
+        with self._lock:
+            if namespace is None:
+                self._filters.clear()
+            else:
+                self._filters.pop(namespace, None)
+
+    def seen(self, namespace: str, key) -> bool:
+        """key: one item key (str or number) or an iterable of keys that must all be seen."""
+        return self.seen_all(namespace, key)
+
+    def seen_all(self, namespace: str, keys) -> bool:
+        """True if every key was seen. Bloom misses answer without the database; the rest is one query."""
+        hashes = list(_key_hashes(keys))
+        if not hashes:
+            return False
+        bloom = self._filter(namespace)
+        if any(h not in bloom for h in hashes):
+            return False
+        found = 0
+        conn = self._connect()
+        try:
+            for i in range(0, len(hashes), SQL_IN_CHUNK):
+                chunk = hashes[i:i + SQL_IN_CHUNK]
+                found += conn.execute(
+                    f"SELECT COUNT(*) FROM seen WHERE namespace = ? AND key_hash IN ({','.join('?' * len(chunk))})",
+                    (namespace, *chunk),
+                ).fetchone()[0]
+        finally:
+            conn.close()
+        return found == len(hashes)
+
+    def mark(self, namespace: str, keys) -> int:
+        """Mark one key or an iterable of keys as seen. Returns how many were new."""
+        hashes = list(_key_hashes(keys))
+        if not hashes:
+            return 0
+        bloom = self._filter(namespace)
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO seen (namespace, key_hash, first_seen, last_seen) VALUES (?, ?, ?, ?)",
+                [(namespace, h, now, now) for h in hashes],
+            )
+            new = conn.total_changes - before
+            conn.executemany(
+                "UPDATE seen SET last_seen = ? WHERE namespace = ? AND key_hash = ?",
+                [(now, namespace, h) for h in hashes],
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        with self._lock:
+            for h in hashes:
+                bloom.add(h)
+        return new
+
+    def forget(self, namespace: str, older_than_days: float = None):
+        """Clear a namespace (or just entries not seen for older_than_days)."""
+        conn = self._connect()
+        try:
+            if older_than_days is None:
+                conn.execute("DELETE FROM seen WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute(
+                    "DELETE FROM seen WHERE namespace = ? AND last_seen < ?",
+                    (namespace, time.time() - older_than_days * 86400),
+                )
+        finally:
+            conn.close()
+        with self._lock:
+            self._filters.pop(namespace, None)
+
+
+async def read_item_keys(page, selectors, attribute: str = "href", first_only: bool = True,
+                         strip_query: bool = False):
+    """
+    Read item keys from the page: `attribute` of elements matching the first
+    selector that matches anything ("text" reads inner text). Relative URLs are
+    resolved against the page URL.
+    """
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    for selector in selectors or []:
+        if not selector:
+            continue
+        elements = await page.query_selector_all(selector)
+        if not elements:
+            continue
+        keys = []
+        for el in elements[:1] if first_only else elements:
+            value = await el.inner_text() if attribute == "text" else await el.get_attribute(attribute)
+            if not value:
+                continue
+            value = value.strip()
+            if attribute in ("href", "src"):
+                value = urljoin(page.url, value)
+                if strip_query:
+                    value = urlunsplit(urlsplit(value)._replace(query="", fragment=""))
+            keys.append(value)
+        return keys
+    return []
+
+
+_seen_index = None
+
+def get_seen_index() -> SeenIndex:
+    """Process-wide SeenIndex, opened on first use."""
+    global _seen_index
+    if _seen_index is None:
+        _seen_index = SeenIndex()
+    return _seen_index
+
+
+def refresh_seen_index():
+    """Called when a run starts: reload Bloom filters lazily (no-op if the index was never opened)."""
+    if _seen_index is not None:
+        _seen_index.refresh()
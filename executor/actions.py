@@ -1,5 +1,10 @@
+import functools
 from typing import List, Dict
 from playwright.async_api import Page
+from data.context import Context
+from executor.ratelimit import rate_limiter, domain_of
+from executor.trace import NULL_TRACE
+from data.seen import get_seen_index, read_item_keys
 
 ACTIONS = {}
 
@@ -9,8 +14,25 @@ def register_action(name):
         return func
     return decorator
 
+def rate_limited(navigation: bool = False):
+    """
+    Gate an action on the shared per-domain rate limiter.
+    Navigations are charged to the target URL (state['value']), interactions to the current page.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(page: Page, state: dict, context: Context):
+            url = state.get("value") if navigation else page.url
+            # Own span, so time spent waiting for a token isn't blamed on the action itself
+            with context.data.get("trace", NULL_TRACE).span(f"ratelimit {domain_of(url)}", "ratelimit"):
+                await rate_limiter.acquire(url, context.data.get("rate_limits"))
+            return await func(page, state, context)
+        return wrapper
+    return decorator
+
 @register_action("press_enter")
-async def press_enter(page: Page, state: Dict, context: Dict):
+@rate_limited()
+async def press_enter(page: Page, state: Dict, context: Context):
     """
     Press the Enter key on a given selector, or on the active element if no selector is provided.
     """
@@ -29,7 +51,7 @@ async def press_enter(page: Page, state: Dict, context: Dict):
     raise Exception(f"No working selector to press Enter for state {state['id']}")
 
 @register_action("do_nothing")
-async def do_nothing(page: Page, state: dict, context: dict):
+async def do_nothing(page: Page, state: dict, context: Context):
     """
     A no-op action that does nothing.
     Useful for states that only have conditions/transitions.
@@ -37,7 +59,8 @@ async def do_nothing(page: Page, state: dict, context: dict):
     pass
 
 @register_action("navigate_to")
-async def navigate_to(page: Page, state: dict, context: dict):
+@rate_limited(navigation=True)
+async def navigate_to(page: Page, state: dict, context: Context):
     """
     Navigate the page to the URL specified in state['value'].
     Optional: state['timeout'] in milliseconds.
@@ -52,7 +75,8 @@ async def navigate_to(page: Page, state: dict, context: dict):
     await page.wait_for_load_state("domcontentloaded", timeout=timeout)
 
 @register_action("click")
-async def click(page: Page, state: dict, context: dict):
+@rate_limited()
+async def click(page: Page, state: dict, context: Context):
     selectors = state.get("selectors") or [state.get("selector")]
     for s in selectors:
         if await page.query_selector(s):
@@ -62,7 +86,8 @@ async def click(page: Page, state: dict, context: dict):
     raise Exception(f"No working selector for click in state {state['id']}")
 
 @register_action("fill")
-async def fill(page: Page, state: dict, context: dict):
+@rate_limited()
+async def fill(page: Page, state: dict, context: Context):
     value = state.get("value")
     selectors = state.get("selectors") or [state.get("selector")]
     for s in selectors:
@@ -73,20 +98,21 @@ async def fill(page: Page, state: dict, context: dict):
     raise Exception(f"No working selector for fill in state {state['id']}")
 
 @register_action("extract")
-async def extract(page: Page, state: dict, context: dict):
+async def extract(page: Page, state: dict, context: Context):
     store_as = state.get("store_as")
     selectors = state.get("selectors") or [state.get("selector")]
     for s in selectors:
         el = await page.query_selector(s)
         if el:
             text = await page.inner_text(s)
-            context[store_as] = text
+            context.set(store_as, text)
             print(f"Extracted '{text}' into {store_as}")
             return
     raise Exception(f"No working selector for extract in state {state['id']}")
 
 @register_action("hover")
-async def hover(page: Page, state: dict, context: dict):
+@rate_limited()
+async def hover(page: Page, state: dict, context: Context):
     selectors = state.get("selectors") or [state.get("selector")]
     for s in selectors:
         if await page.query_selector(s):
@@ -96,7 +122,7 @@ async def hover(page: Page, state: dict, context: dict):
     raise Exception(f"No working selector for hover in state {state['id']}")
 
 @register_action("scroll_into_view")
-async def scroll_into_view(page: Page, state: dict, context: dict):
+async def scroll_into_view(page: Page, state: dict, context: Context):
     """
     Scroll the first matching selector into view if needed.
     Accepts multiple selectors (tries in order).
@@ -111,7 +137,7 @@ async def scroll_into_view(page: Page, state: dict, context: dict):
     raise Exception(f"No working selector for scroll_into_view in state {state['id']}")
 
 @register_action("wait_for_selector")
-async def wait_for_selector(page: Page, state: dict, context: dict):
+async def wait_for_selector(page: Page, state: dict, context: Context):
     """
     Wait for a selector to appear using Locator API.
     Optional keys:
@@ -134,7 +160,8 @@ async def wait_for_selector(page: Page, state: dict, context: dict):
     raise Exception(f"No locator became ready in state {state['id']}")
 
 @register_action("click_scroll_into_view")
-async def click_scroll_into_view(page: Page, state: dict, context: dict):
+@rate_limited()
+async def click_scroll_into_view(page: Page, state: dict, context: Context):
     selectors = state.get("selectors") or [state.get("selector")]
     for s in selectors:
         el = await page.query_selector(s)
@@ -144,3 +171,39 @@ async def click_scroll_into_view(page: Page, state: dict, context: dict):
             print(f"Clicked {s} after scrolling into view")
             return
     raise Exception(f"No working selector for click_scroll_into_view in state {state['id']}")
+
+@register_action("set_variable")
+async def set_variable(page: Page, state: dict, context: Context):
+    """
+    Store state['value'] (after {{var}} rendering) into the variable named by state['store_as'].
+    """
+    store_as = state.get("store_as")
+    if not store_as:
+        raise Exception(f"No store_as provided for set_variable in state {state['id']}")
+    context.set(store_as, state.get("value"))
+    print(f"Set {store_as} = {state.get('value')!r}")
+
+@register_action("mark_seen")
+async def mark_seen(page: Page, state: dict, context: Context):
+    """
+    Remember items so later runs can skip them (see the item_seen / all_items_seen conditions).
+    The item is state['value'] (e.g. "{{job_url}}"), or state['attribute'] (default href) of the
+    first element matching state['selectors'] - of every match if state['all'] is true.
+    Optional: state['namespace'] (defaults to the bot name), state['strip_query'].
+    """
+    value = state.get("value")
+    if value is not None and value != "":
+        keys = value if isinstance(value, list) else [value]
+    else:
+        keys = await read_item_keys(
+            page,
+            state.get("selectors") or [state.get("selector")],
+            state.get("attribute", "href"),
+            not state.get("all", False),
+            state.get("strip_query", False),
+        )
+    if not keys:
+        raise Exception(f"No item to mark as seen in state {state['id']}")
+    namespace = state.get("namespace") or context.data.get("bot_name", "")
+    new = get_seen_index().mark(namespace, keys)
+    print(f"👁 Marked {len(keys)} item(s) as seen ({new} new)")
@@ -6,17 +6,25 @@ from flask import jsonify, request
 from executor.runner import run_bot
 from executor import actions as actions_module, conditions as conditions_module
 from data.context import Context
+from data.history import RunHistory, RunLogger, run_in_writer
 import asyncio
 import threading
 from playwright.async_api import async_playwright
-from executor.session import launch_persistent_context
+from executor.session import launch_persistent_context, resolve_launch_profile, LAUNCH_PROFILES, DEFAULT_LAUNCH_PROFILE
+from executor.jobs import JobQueue, JOB_CONTROLS
+from executor.http_cache import json_response, conditional_response
+from executor.bot_store import bot_store, RevisionConflict, PatchError
 
 # ----------------------------- BotRunner Class -----------------------------
 class BotRunner:
-    def __init__(self, bot_name, bot_file):
+    def __init__(self, bot_name, bot_file, job_id=None, variables=None):
         self.bot_name = bot_name      # <--- add this
         self.bot_file = bot_file
+        self.job_id = job_id
+        self.variables = variables    # initial context variables (e.g. from a job payload)
         self.is_running = False
+        self.status = None            # done | stopped | failed once run() returns
+        self.error = None             # repr of the exception when status is failed
         self.browser = None
         self.page = None
         self._stop_event = asyncio.Event()
@@ -26,14 +34,22 @@ class BotRunner:
     async def run(self):
         self.is_running = True
         print(f"🔹 Starting bot: {self.bot_name}, file: {self.bot_file}")
+        history = await run_in_writer(RunHistory)
+        run_id = await run_in_writer(history.start_run, self.bot_name, self.job_id)
+        run_log = RunLogger(history, run_id, self.bot_name)
+        status, error = "done", None
         try:
-            context_obj = Context()
-            # Use persistent context for fullscreen
-            self.playwright, self.browser, self.page = await launch_persistent_context(self.bot_name, headless=False)
-            await self.page.set_viewport_size({"width": 1920, "height": 1080})  # force HTML scaling
+            context_obj = Context(self.variables)
+            with open(self.bot_file, "r") as f:
+                bot_data = json.load(f)
+            # Launch profile (headless/headed/mobile...) picked per bot; viewport is set at launch
+            self.playwright, self.browser, self.page = await launch_persistent_context(
+                self.bot_name, profile=bot_data.get("launch_profile"), overrides=bot_data.get("launch")
+            )
 
             bot_task = asyncio.create_task(
-                run_bot(self.bot_name, self.page, self.bot_file, context_obj, self._pause_event, self._stop_event)
+                run_bot(self.bot_name, self.page, self.bot_file, context_obj, self._pause_event, self._stop_event,
+                        run_log=run_log)
             )
             stop_task = asyncio.create_task(self._wait_for_stop())
 
@@ -51,7 +67,16 @@ class BotRunner:
                     await bot_task
                 except asyncio.CancelledError:
                     pass
+            elif bot_task.exception():
+                status, error = "failed", repr(bot_task.exception())
+        except Exception as e:
+            status, error = "failed", repr(e)
+            raise
         finally:
+            if status == "done" and self._stop_event.is_set():
+                status = "stopped"
+            self.status, self.error = status, error
+            await run_log.close(status, error)
             if self.browser:
                 await self.browser.close()
             self.is_running = False
@@ -83,15 +108,46 @@ def run_bot_async(bot_name, bot_file):
     bot_threads[bot_name] = thread
     thread.start()
 
+def find_bot_file(bot_name):
+    """Return the path of the bot definition whose bot_name matches, or None."""
+    bots_dir = Path("bots")
+    for file_path in bots_dir.glob("*.json"):
+        try:
+            with open(file_path, "r") as f:
+                bot_data = json.load(f)
+                if bot_data.get("bot_name") == bot_name:
+                    return str(file_path)
+        except:
+            continue
+    return None
+
 # ----------------------------- Register API Routes -----------------------------
-def register_api_routes(app, running_bots, bot_threads):
+def register_api_routes(app, running_bots, bot_threads, worker_mode=False):
+    """
+    worker_mode: bots run in worker processes (main.py --workers N), so
+    start/stop/pause/resume and running state go through the job queue
+    instead of in-process threads.
+    """
 
     # ✅ Lazy import to avoid circular dependency
     from main import running_bots, bot_threads
 
+    job_queue = JobQueue()
+
+    def bot_is_running(bot_name):
+        if worker_mode:
+            return job_queue.is_active(bot_name)
+        return bot_name in running_bots and running_bots[bot_name].is_running
+
+    def control_bot(bot_name, control):
+        """Forward stop/pause/resume to the bot's active job. Returns False if it has none."""
+        job = job_queue.active_job(bot_name)
+        return bool(job) and job_queue.request_control(job["id"], control)
+
     # ----------- Bot Management -----------
     @app.route("/api/bots", methods=["GET"])
     def get_bots():
+        bot_store.flush()
         bots_dir = Path("bots")
         bots = []
         if bots_dir.exists():
@@ -102,9 +158,7 @@ def register_api_routes(app, running_bots, bot_threads):
                         bot_name = bot_data.get("bot_name", bot_file.stem)
                         bot_description = bot_data.get("bot_description", "Description not available")
                         bot_image = bot_data.get("bot_image", "bot image is not")
-                        is_running = (
-                            bot_name in running_bots and running_bots[bot_name].is_running
-                        )
+                        is_running = bot_is_running(bot_name)
                         bots.append(
                             {
                                 "name": bot_name,
@@ -118,7 +172,7 @@ def register_api_routes(app, running_bots, bot_threads):
                         )
                 except Exception as e:
                     print(f"Error reading bot file {bot_file}: {e}")
-        return jsonify(bots)
+        return json_response(bots)
 
     @app.route("/api/bots/save", methods=["POST"])
     def save_bot():
@@ -128,37 +182,54 @@ def register_api_routes(app, running_bots, bot_threads):
             return jsonify({"error": "bot_name missing"}), 400
 
         file_name = data.get("file_name") or f"{bot_name.lower().replace(' ', '_')}.json"
-        bots_dir = Path("bots")
-        bots_dir.mkdir(exist_ok=True)
-        file_path = bots_dir / file_name
 
         try:
-            with open(file_path, "w") as f:
-                json.dump(data, f, indent=2)
-            return jsonify({"message": f"Bot {bot_name} saved as {file_name}"})
+            # The editor sends the revision it loaded; a stale one means someone else saved in between
+            revision = bot_store.save(file_name, data, data.get("revision"))
+            return jsonify({"message": f"Bot {bot_name} saved as {file_name}", "revision": revision})
+        except RevisionConflict as e:
+            return jsonify({"error": str(e), "revision": e.current_revision}), 409
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @app.route("/api/bots/<bot_file>", methods=["PATCH"])
+    def patch_bot(bot_file):
+        data = request.get_json() or {}
+        ops = data.get("ops")
+        if not isinstance(ops, list):
+            return jsonify({"error": "ops missing"}), 400
+        base_revision = data.get("revision")
+        if not isinstance(base_revision, int) or isinstance(base_revision, bool):
+            # Without the client's revision there is no way to detect a conflicting edit
+            return jsonify({"error": "revision missing"}), 400
+        try:
+            revision = bot_store.patch(bot_file, ops, base_revision)
+            return jsonify({"revision": revision})
+        except FileNotFoundError:
+            return jsonify({"error": "Bot not found"}), 404
+        except RevisionConflict as e:
+            return jsonify({"error": str(e), "revision": e.current_revision}), 409
+        except PatchError as e:
+            return jsonify({"error": str(e)}), 400
+
+    @app.route("/api/bots/<bot_file>/history", methods=["GET"])
+    def get_bot_history(bot_file):
+        return jsonify(bot_store.history(bot_file, min(request.args.get("limit", 50, type=int), 500)))
+
     @app.route("/api/bots/<bot_name>/start", methods=["POST"])
     def start_bot(bot_name):
-        if bot_name in running_bots and running_bots[bot_name].is_running:
+        if bot_is_running(bot_name):
             return jsonify({"error": "Bot is already running"}), 400
 
-        bots_dir = Path("bots")
-        bot_file = None
-        for file_path in bots_dir.glob("*.json"):
-            try:
-                with open(file_path, "r") as f:
-                    bot_data = json.load(f)
-                    if bot_data.get("bot_name") == bot_name:
-                        bot_file = str(file_path)
-                        break
-            except:
-                continue
-
+        bot_store.flush()
+        bot_file = find_bot_file(bot_name)
         if not bot_file:
             return jsonify({"error": "Bot not found"}), 404
 
+        if worker_mode:
+            job_id = job_queue.submit(bot_name, bot_file)
+            return jsonify({"message": f"Bot {bot_name} queued", "job_id": job_id})
+
         run_bot_async(bot_name, bot_file)
         return jsonify({"message": f"Bot {bot_name} started"})
 
@@ -166,6 +237,11 @@ def register_api_routes(app, running_bots, bot_threads):
 
     @app.route("/api/bots/<bot_name>/stop", methods=["POST"])
     def stop_bot(bot_name):
+        if worker_mode:
+            if not control_bot(bot_name, "stop"):
+                return jsonify({"error": "Bot is not running"}), 400
+            print(f"🛑 STOP requested for bot {bot_name}")
+            return jsonify({"message": f"Bot {bot_name} stopped"})
         runner = running_bots.get(bot_name)
         if not runner:
             return jsonify({"error": "Bot is not running"}), 400
@@ -177,6 +253,11 @@ def register_api_routes(app, running_bots, bot_threads):
 
     @app.route("/api/bots/<bot_name>/pause", methods=["POST"])
     def pause_bot(bot_name):
+        if worker_mode:
+            if not control_bot(bot_name, "pause"):
+                return jsonify({"error": "Bot not running"}), 400
+            print(f"⏸ PAUSE requested for bot {bot_name}")
+            return jsonify({"message": f"Bot {bot_name} paused"})
         runner = running_bots.get(bot_name)
         if not runner:
             return jsonify({"error": "Bot not running"}), 400
@@ -187,6 +268,11 @@ def register_api_routes(app, running_bots, bot_threads):
 
     @app.route("/api/bots/<bot_name>/resume", methods=["POST"])
     def resume_bot(bot_name):
+        if worker_mode:
+            if not control_bot(bot_name, "resume"):
+                return jsonify({"error": "Bot not running"}), 400
+            print(f"▶️ RESUME requested for bot {bot_name}")
+            return jsonify({"message": f"Bot {bot_name} resumed"})
         runner = running_bots.get(bot_name)
         if not runner:
             return jsonify({"error": "Bot not running"}), 400
@@ -201,6 +287,7 @@ def register_api_routes(app, running_bots, bot_threads):
         if not file_path.exists() or not file_path.is_file():
             return jsonify({"error": "Bot not found"}), 404
         try:
+            bot_store.forget(bot_file)
             file_path.unlink()
             return jsonify({"message": f"Bot {bot_file} deleted"})
         except Exception as e:
@@ -212,13 +299,89 @@ def register_api_routes(app, running_bots, bot_threads):
         file_path = bots_dir / bot_file
         if not file_path.exists() or not file_path.is_file():
             return jsonify({"error": "Bot not found"}), 404
-        with open(file_path, "r") as f:
-            return jsonify(json.load(f))
+        bot_store.flush(bot_file)
+        return conditional_response(file_path.read_bytes(), "application/json")
 
     @app.route("/api/bots/<bot_name>/status", methods=["GET"])
     def get_bot_status(bot_name):
-        is_running = bot_name in running_bots and running_bots[bot_name].is_running
-        return jsonify({"is_running": is_running})
+        return jsonify({"is_running": bot_is_running(bot_name)})
+
+    # ----------- Job Queue (worker pool mode) -----------
+    @app.route("/api/jobs", methods=["POST"])
+    def submit_job():
+        if not worker_mode:
+            # Nothing would ever claim the job: bots run as in-process threads
+            return jsonify({"error": "Job queue needs worker mode (start the server with --workers N)"}), 503
+        data = request.get_json() or {}
+        bot_name = data.get("bot_name")
+        if not bot_name:
+            return jsonify({"error": "bot_name missing"}), 400
+        bot_store.flush()
+        bot_file = find_bot_file(bot_name)
+        if not bot_file:
+            return jsonify({"error": "Bot not found"}), 404
+        job_id = job_queue.submit(bot_name, bot_file, data.get("payload"))
+        return jsonify({"message": f"Bot {bot_name} queued", "job_id": job_id}), 202
+
+    @app.route("/api/jobs", methods=["GET"])
+    def list_jobs():
+        jobs = job_queue.list(
+            status=request.args.get("status"),
+            bot_name=request.args.get("bot"),
+            limit=min(request.args.get("limit", 100, type=int), 1000),
+            before_id=request.args.get("before", type=int),
+        )
+        return jsonify(jobs)
+
+    @app.route("/api/jobs/<int:job_id>", methods=["GET"])
+    def get_job(job_id):
+        job = job_queue.get(job_id)
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job)
+
+    @app.route("/api/jobs/<int:job_id>/<control>", methods=["POST"])
+    def control_job(job_id, control):
+        if control not in JOB_CONTROLS:
+            return jsonify({"error": f"Unknown control '{control}'"}), 400
+        if not job_queue.request_control(job_id, control):
+            return jsonify({"error": "Job is not queued or running"}), 400
+        return jsonify({"message": f"{control} requested for job {job_id}"})
+
+    # ----------- Run History & Logs -----------
+    history = RunHistory()
+
+    @app.route("/api/runs", methods=["GET"])
+    def list_runs():
+        runs = history.list_runs(
+            bot_name=request.args.get("bot"),
+            status=request.args.get("status"),
+            since=request.args.get("since", type=float),
+            until=request.args.get("until", type=float),
+            limit=min(request.args.get("limit", 50, type=int), 500),
+            before=request.args.get("before", type=int),
+        )
+        return jsonify({"items": runs, "next_before": runs[-1]["id"] if runs else None})
+
+    @app.route("/api/runs/<int:run_id>", methods=["GET"])
+    def get_run(run_id):
+        run = history.get_run(run_id)
+        if not run:
+            return jsonify({"error": "Run not found"}), 404
+        return jsonify(run)
+
+    @app.route("/api/logs", methods=["GET"])
+    def query_logs():
+        logs = history.query_logs(
+            bot_name=request.args.get("bot"),
+            run_id=request.args.get("run", type=int),
+            level=(request.args.get("level") or "").upper() or None,
+            since=request.args.get("since", type=float),
+            until=request.args.get("until", type=float),
+            limit=min(request.args.get("limit", 100, type=int), 1000),
+            before=request.args.get("before", type=int),
+        )
+        return jsonify({"items": logs, "next_before": logs[-1]["id"] if logs else None})
 
     # ----------- Actions & Conditions -----------
     @app.route("/api/actions", methods=["GET"])
@@ -235,6 +398,8 @@ def register_api_routes(app, running_bots, bot_threads):
         # Only minimal info frontend may need
         return jsonify({
             "app_title": "🤖 Bot Framework",
-            "browser_headless": False,
+            "browser_headless": resolve_launch_profile()["headless"],
+            "launch_profiles": sorted(LAUNCH_PROFILES),
+            "default_launch_profile": DEFAULT_LAUNCH_PROFILE,
             "default_start_url": "https://example.com"
         })
@@ -0,0 +1,285 @@
+# executor/bot_store.py
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+BOTS_DIR = Path("bots")
+HISTORY_DIR = Path("data") / "bot_history"
+
+FLUSH_DELAY = 0.5       # seconds of quiet before a patched bot is written to disk
+MAX_FLUSH_DELAY = 2.0   # never hold unsaved edits longer than this during a burst
+HISTORY_KEEP = 500      # edit-history lines kept per bot (compacted every HISTORY_KEEP revisions)
+
+
+class RevisionConflict(Exception):
+    def __init__(self, current_revision):
+        super().__init__(f"Bot was modified (current revision {current_revision})")
+        self.current_revision = current_revision
+
+
+class PatchError(Exception):
+    pass
+
+
+def atomic_write_json(path: Path, data: dict):
+    """Write JSON to a temp file in the same folder, fsync, then rename over the target."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# ----------------------------- Patch Operations -----------------------------
+def _state_index(states, state_id):
+    for i, s in enumerate(states):
+        if s.get("id") == state_id:
+            return i
+    raise PatchError(f"State '{state_id}' not found")
+
+
+def _dict_arg(op: dict, name: str) -> dict:
+    value = op.get(name, {})
+    if not isinstance(value, dict):
+        raise PatchError(f"{op.get('op')}: '{name}' must be an object")
+    return value
+
+
+def apply_ops(bot: dict, ops: list):
+    """
+    Apply state-level edit operations to a bot dict in place. State dicts are
+    replaced, never mutated, so callers only need to copy the bot and its list:
+      {"op": "set", "fields": {...}}                        top-level fields (not states)
+      {"op": "add_state", "state": {...}, "index": n}       index optional (append)
+      {"op": "set_state", "id": ..., "state": {...}}        replace a state
+      {"op": "update_state", "id": ..., "fields": {...}}    shallow-merge into a state
+      {"op": "remove_state", "id": ...}
+      {"op": "reorder", "order": [id, ...]}                 full new state order
+    Malformed ops raise PatchError.
+    """
+    states = bot.setdefault("states", [])
+    for op in ops:
+        if not isinstance(op, dict):
+            raise PatchError("Each patch op must be an object")
+        kind = op.get("op")
+        if kind == "set":
+            fields = {k: v for k, v in _dict_arg(op, "fields").items() if k not in ("states", "revision")}
+            bot.update(fields)
+        elif kind == "add_state":
+            state = _dict_arg(op, "state")
+            if not isinstance(state.get("id"), str) or not state["id"]:
+                raise PatchError("add_state requires state.id")
+            if any(s.get("id") == state["id"] for s in states):
+                raise PatchError(f"State '{state['id']}' already exists")
+            index = op.get("index", len(states))
+            if not isinstance(index, int) or isinstance(index, bool):
+                raise PatchError("add_state: 'index' must be an integer")
+            states.insert(index, state)
+        elif kind == "set_state":
+            state = _dict_arg(op, "state")
+            if state.get("id") != op.get("id"):
+                raise PatchError("set_state cannot change a state's id (remove_state + add_state instead)")
+            states[_state_index(states, op.get("id"))] = state
+        elif kind == "update_state":
+            fields = _dict_arg(op, "fields")
+            if "id" in fields and fields["id"] != op.get("id"):
+                raise PatchError("update_state cannot change a state's id (remove_state + add_state instead)")
+            i = _state_index(states, op.get("id"))
+            states[i] = {**states[i], **fields}
+        elif kind == "remove_state":
+            states.pop(_state_index(states, op.get("id")))
+        elif kind == "reorder":
+            order = op.get("order", [])
+            if not isinstance(order, list) or not all(isinstance(i, str) for i in order):
+                raise PatchError("reorder: 'order' must be a list of state ids")
+            by_id = {s.get("id"): s for s in states}
+            if len(order) != len(states) or set(order) != set(by_id):
+                raise PatchError("reorder must list every state id exactly once")
+            states[:] = [by_id[i] for i in order]
+        else:
+            raise PatchError(f"Unknown patch op '{kind}'")
+
+
+# ----------------------------- Bot Store -----------------------------
+class _Entry:
+    __slots__ = ("bot", "mtime", "dirty_since", "last_edit", "lock")
+
+    def __init__(self, bot, mtime=None):
+        self.bot = bot
+        self.mtime = mtime
+        self.dirty_since = None
+        self.last_edit = None
+        self.lock = threading.Lock()
+
+
+class BotStore:
+    """
+    In-memory cache of bot definitions with revisioned patches.
+
+    Patches are applied to the cached copy immediately and written to disk
+    (atomically) once edits go quiet for FLUSH_DELAY, or at most
+    MAX_FLUSH_DELAY after the first unsaved edit. Readers that need the file
+    on disk call flush() first.
+    """
+
+    def __init__(self, bots_dir=BOTS_DIR, history_dir=HISTORY_DIR):
+        self.bots_dir = Path(bots_dir)
+        self.history_dir = Path(history_dir)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def _path(self, file_name: str) -> Path:
+        path = self.bots_dir / file_name
+        if path.parent != self.bots_dir or not file_name.endswith(".json"):
+            raise PatchError(f"Invalid bot file name '{file_name}'")
+        return path
+
+    def _entry(self, file_name: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(file_name)
+            path = self._path(file_name)
+            if entry is not None and entry.dirty_since is None and path.is_file() \
+                    and path.stat().st_mtime_ns != entry.mtime:
+                entry = None  # edited outside the store, reload
+            if entry is None:
+                if not path.is_file():
+                    raise FileNotFoundError(file_name)
+                with open(path, "r") as f:
+                    entry = self._entries[file_name] = _Entry(json.load(f), path.stat().st_mtime_ns)
+            return entry
+
+    # -------------------- Writes --------------------
+    def save(self, file_name: str, bot: dict, base_revision: int = None) -> int:
+        """Full save (create or overwrite). Written to disk immediately."""
+        path = self._path(file_name)
+        self.bots_dir.mkdir(exist_ok=True)
+        try:
+            entry = self._entry(file_name)
+        except FileNotFoundError:
+            with self._lock:
+                entry = self._entries.setdefault(file_name, _Entry({}))
+        with entry.lock:
+            current = entry.bot.get("revision", 0)
+            if base_revision is not None and base_revision != current:
+                raise RevisionConflict(current)
+            bot = dict(bot)
+            bot["revision"] = current + 1
+            atomic_write_json(path, bot)
+            entry.bot, entry.dirty_since, entry.last_edit = bot, None, None
+            entry.mtime = path.stat().st_mtime_ns
+        self._record_history(file_name, bot["revision"], [{"op": "save"}])
+        return bot["revision"]
+
+    def patch(self, file_name: str, ops: list, base_revision: int = None) -> int:
+        entry = self._entry(file_name)
+        with entry.lock:
+            current = entry.bot.get("revision", 0)
+            if base_revision is not None and base_revision != current:
+                raise RevisionConflict(current)
+            # Apply to a shallow copy so a bad op leaves the cached bot untouched
+            bot = dict(entry.bot)
+            bot["states"] = list(bot.get("states", []))
+            apply_ops(bot, ops)
+            bot["revision"] = current + 1
+            entry.bot = bot
+            now = time.monotonic()
+            entry.last_edit = now
+            if entry.dirty_since is None:
+                entry.dirty_since = now
+        self._record_history(file_name, bot["revision"], ops)
+        self._schedule_flush()
+        return bot["revision"]
+
+    # -------------------- Flushing --------------------
+    def _schedule_flush(self):
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_DELAY / 2)
+            now = time.monotonic()
+            pending = False
+            for file_name, entry in list(self._entries.items()):
+                if entry.dirty_since is None:
+                    continue
+                if now - entry.last_edit >= FLUSH_DELAY or now - entry.dirty_since >= MAX_FLUSH_DELAY:
+                    self.flush(file_name)
+                else:
+                    pending = True
+            if not pending:
+                with self._lock:
+                    if not any(e.dirty_since is not None for e in self._entries.values()):
+                        self._flusher = None
+                        return
+
+    def flush(self, file_name: str = None):
+        """Write pending edits for one bot (or all bots) to disk."""
+        names = [file_name] if file_name else list(self._entries)
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is None:
+                continue
+            with entry.lock:
+                if entry.dirty_since is None:
+                    continue
+                try:
+                    path = self._path(name)
+                    atomic_write_json(path, entry.bot)
+                    entry.dirty_since = entry.last_edit = None
+                    entry.mtime = path.stat().st_mtime_ns
+                except Exception as e:
+                    print(f"⚠️ Failed to write bot {name}: {e}")
+
+    def forget(self, file_name: str):
+        """Drop a cached bot (after delete or external edits)."""
+        with self._lock:
+            self._entries.pop(file_name, None)
+
+    # -------------------- History --------------------
+    def _record_history(self, file_name: str, revision: int, ops: list):
+        try:
+            self.history_dir.mkdir(parents=True, exist_ok=True)
+            path = self.history_dir / f"{Path(file_name).stem}.jsonl"
+            line = json.dumps({"revision": revision, "ts": time.time(), "ops": ops}, separators=(",", ":"))
+            with open(path, "a") as f:
+                f.write(line + "\n")
+            if revision % HISTORY_KEEP == 0:
+                self._compact_history(path)
+        except Exception as e:
+            print(f"⚠️ Failed to record edit history for {file_name}: {e}")
+
+    def _compact_history(self, path: Path):
+        with open(path, "r") as f:
+            lines = deque(f, maxlen=HISTORY_KEEP)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent))
+        with os.fdopen(fd, "w") as f:
+            f.writelines(lines)
+        os.replace(tmp, path)
+
+    def history(self, file_name: str, limit: int = 50):
+        path = self.history_dir / f"{Path(file_name).stem}.jsonl"
+        if not path.exists():
+            return []
+        with open(path, "r") as f:
+            lines = deque(f, maxlen=limit)
+        return [json.loads(l) for l in reversed(lines)]
+
+
+bot_store = BotStore()
@@ -1,6 +1,8 @@
 # executor/conditions.py
 from typing import List, Union
 from playwright.async_api import Page
+from data.context import Context
+from data.seen import get_seen_index, read_item_keys
 
 CONDITIONS = {}
 
@@ -12,14 +14,14 @@ def register_condition(name):
 
 # -------------------- Basic / Always --------------------
 @register_condition("always")
-async def always(page: Page, context: dict, **kwargs):
+async def always(page: Page, context: Context, **kwargs):
     return True
 
 # -------------------- Wait for Element --------------------
 @register_condition("wait_for_element")
 async def wait_for_element(
     page: Page,
-    context: dict,
+    context: Context,
     conditional_parameter: Union[List[str], str] = None,
     timeout: int = 10000,
     state: str = "visible",  # 'attached' | 'detached' | 'visible' | 'hidden'
@@ -47,7 +49,7 @@ async def wait_for_element(
 @register_condition("wait_for_element_not_exists")
 async def wait_for_element_not_exists(
     page: Page,
-    context: dict,
+    context: Context,
     conditional_parameter: Union[List[str], str] = None,
     timeout: int = 10000,
     **kwargs
@@ -74,7 +76,7 @@ async def wait_for_element_not_exists(
 @register_condition("variable_equals")
 async def variable_equals(
     page: Page,
-    context: dict,
+    context: Context,
     var: str = None,
     value=None,
     **kwargs
@@ -85,7 +87,7 @@ async def variable_equals(
 @register_condition("text_contains")
 async def text_contains(
     page: Page,
-    context: dict,
+    context: Context,
     conditional_parameter: Union[List[str], str] = None,
     text: str = "",
     **kwargs
@@ -108,7 +110,7 @@ async def text_contains(
 @register_condition("url_matches")
 async def url_matches(
     page: Page,
-    context: dict,
+    context: Context,
     conditional_parameter: Union[List[str], str] = None,
     **kwargs
 ):
@@ -123,3 +125,44 @@ async def url_matches(
         if pattern in url:
             return True
     return False
+
+
+# -------------------- Seen Items (incremental crawling) --------------------
+@register_condition("item_seen")
+async def item_seen(
+    page: Page,
+    context: Context,
+    conditional_parameter: Union[List[str], str] = None,
+    key: str = None,
+    attribute: str = "href",
+    namespace: str = None,
+    strip_query: bool = False,
+    **kwargs
+):
+    """
+    True if the item was already marked seen (by this bot, or `namespace`).
+    The item is `key` (e.g. "{{job_url}}", may be a number or a list of keys that
+    must all be seen) or `attribute` of the first element matching conditional_parameter.
+    """
+    namespace = namespace or context.data.get("bot_name", "")
+    if key is not None and key != "":
+        return get_seen_index().seen(namespace, key)
+    keys = await read_item_keys(page, conditional_parameter, attribute, True, strip_query)
+    return get_seen_index().seen_all(namespace, keys)
+
+@register_condition("all_items_seen")
+async def all_items_seen(
+    page: Page,
+    context: Context,
+    conditional_parameter: Union[List[str], str] = None,
+    attribute: str = "href",
+    namespace: str = None,
+    strip_query: bool = False,
+    **kwargs
+):
+    """
+    True if every element matching conditional_parameter was already seen,
+    i.e. this listing page holds nothing new and the bot can stop early.
+    """
+    keys = await read_item_keys(page, conditional_parameter, attribute, False, strip_query)
+    return get_seen_index().seen_all(namespace or context.data.get("bot_name", ""), keys)
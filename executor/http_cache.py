@@ -0,0 +1,188 @@
+# executor/http_cache.py
+import gzip
+import hashlib
+import json
+import mimetypes
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from flask import Response, request, abort
+from werkzeug.security import safe_join
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    "application/json", "application/javascript", "text/javascript", "text/css",
+    "text/html", "text/plain", "image/svg+xml",
+}
+MIN_COMPRESS_SIZE = 1024
+COMPRESSED_CACHE_SIZE = 128
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+VERSION_CHECK_INTERVAL = 1.0  # seconds between scans of the asset tree for changes
+
+# Relative asset references in HTML (src="js/app.js") and ES module imports (from './api.js')
+HTML_ASSET_RE = re.compile(r'''((?:src|href)=")(?!https?:|//|data:|#)([^"?#]+\.(?:js|css|ico|png|svg))(")''')
+JS_IMPORT_RE = re.compile(r'''((?:from|import)\s*['"])(\.{1,2}/[^'"?]+\.js)(['"])''')
+
+_compressed_cache = OrderedDict()  # (etag, encoding) -> bytes
+_compressed_cache_lock = threading.Lock()  # Flask's dev server handles requests in threads
+
+
+# ----------------------------- ETag / Conditional GET -----------------------------
+def make_etag(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()[:20]
+
+
+def _client_etags():
+    """Map each base ETag in If-None-Match to the tag the client presented (encoding suffix included)."""
+    header = request.headers.get("If-None-Match", "")
+    tags = {}
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = presented = tag.strip('"')
+        # Compressed variants carry an encoding suffix (see compress_response)
+        for suffix in ("-gzip", "-br"):
+            if tag.endswith(suffix):
+                tag = tag[: -len(suffix)]
+        if tag:
+            tags.setdefault(tag, presented)
+    return tags
+
+
+def conditional_response(body: bytes, mimetype: str, cache_control: str = REVALIDATE_CACHE) -> Response:
+    """Return 304 if the client already has this exact body, otherwise a 200 with a content-hash ETag."""
+    etag = make_etag(body)
+    client_etags = _client_etags()
+    if etag in client_etags or "*" in client_etags:
+        response = Response(status=304)
+        # Echo the variant the client holds (e.g. "<etag>-gzip"), matching the 200 it cached
+        response.set_etag(client_etags.get(etag, etag))
+    else:
+        response = Response(body, mimetype=mimetype)
+        response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    if mimetype in COMPRESSIBLE_TYPES:
+        # Caches must key on encoding even when this particular reply isn't compressed (small body, 304)
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def json_response(payload) -> Response:
+    """jsonify() replacement for cacheable GET endpoints."""
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return conditional_response(body, "application/json")
+
+
+# ----------------------------- Compression -----------------------------
+def compress_response(response: Response) -> Response:
+    """after_request hook: gzip/brotli-encode compressible bodies the client accepts."""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_TYPES
+    ):
+        return response
+
+    accept = request.headers.get("Accept-Encoding", "")
+    if brotli is not None and "br" in accept:
+        encoding = "br"
+    elif "gzip" in accept:
+        encoding = "gzip"
+    else:
+        return response
+
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+
+    etag, _ = response.get_etag()
+    key = (etag, encoding)
+    compressed = None
+    if etag:
+        with _compressed_cache_lock:
+            compressed = _compressed_cache.get(key)
+            if compressed is not None:
+                _compressed_cache.move_to_end(key)
+    if compressed is None:
+        compressed = brotli.compress(body, quality=5) if encoding == "br" else gzip.compress(body, compresslevel=6)
+        if etag:
+            with _compressed_cache_lock:
+                _compressed_cache[key] = compressed
+                if len(_compressed_cache) > COMPRESSED_CACHE_SIZE:
+                    _compressed_cache.popitem(last=False)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    if etag:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+# ----------------------------- Fingerprinted Static Assets -----------------------------
+class StaticAssets:
+    """
+    Serves the dashboard from `root` with fingerprinted URLs.
+
+    All asset references (HTML src/href and relative ES module imports) are
+    rewritten to carry ?v=<version>, where version hashes every file under
+    root. Versioned requests are cached forever; everything else (index.html,
+    unversioned URLs) revalidates via ETag. The tree is rescanned at most once
+    per VERSION_CHECK_INTERVAL.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._stamp = None
+        self._version = None
+        self._checked_at = 0.0
+        self._bodies = {}  # (relpath, version) -> bytes
+
+    def version(self) -> str:
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return self._version
+        self._checked_at = now
+        files = sorted(p for p in self.root.rglob("*") if p.is_file())
+        stamp = tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in files)
+        if stamp != self._stamp:
+            digest = hashlib.sha1()
+            for p in files:
+                digest.update(str(p.relative_to(self.root)).encode())
+                digest.update(p.read_bytes())
+            self._stamp, self._version = stamp, digest.hexdigest()[:12]
+            self._bodies.clear()
+        return self._version
+
+    def _body(self, relpath: str, version: str) -> bytes:
+        key = (relpath, version)
+        if key not in self._bodies:
+            path = safe_join(str(self.root), relpath)
+            if path is None or not Path(path).is_file():
+                abort(404)
+            data = Path(path).read_bytes()
+            if relpath.endswith(".html"):
+                data = HTML_ASSET_RE.sub(rf"\g<1>\g<2>?v={version}\g<3>", data.decode("utf-8")).encode("utf-8")
+            elif relpath.endswith(".js"):
+                data = JS_IMPORT_RE.sub(rf"\g<1>\g<2>?v={version}\g<3>", data.decode("utf-8")).encode("utf-8")
+            self._bodies[key] = data
+        return self._bodies[key]
+
+    def serve(self, relpath: str) -> Response:
+        version = self.version()
+        body = self._body(relpath, version)
+        mimetype = mimetypes.guess_type(relpath)[0] or "application/octet-stream"
+        if mimetype == "application/javascript":
+            mimetype = "text/javascript"
+        versioned = request.args.get("v") == version and not relpath.endswith(".html")
+        return conditional_response(body, mimetype, IMMUTABLE_CACHE if versioned else REVALIDATE_CACHE)
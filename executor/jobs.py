@@ -0,0 +1,237 @@
+# executor/jobs.py
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_JOBS_DB = Path("data") / "jobs.db"
+DEFAULT_LEASE_SECONDS = 30
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Job lifecycle: queued -> running -> done | failed | stopped
+# A running job whose lease expires (worker crashed / hung) goes back to queued
+# until it runs out of attempts.
+JOB_STATUSES = ("queued", "running", "done", "failed", "stopped")
+
+# Control requests the API can leave on a job for its worker to pick up on heartbeat
+JOB_CONTROLS = ("stop", "pause", "resume")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    bot_name      TEXT NOT NULL,
+    bot_file      TEXT NOT NULL,
+    payload       TEXT NOT NULL DEFAULT '{}',
+    status        TEXT NOT NULL DEFAULT 'queued',
+    control       TEXT,
+    worker_id     TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    created_at    REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    error         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_bot ON jobs(bot_name, id);
+"""
+
+
+class JobQueue:
+    """
+    Durable local job queue backed by SQLite.
+
+    Safe to share between the Flask process and worker processes: each
+    process opens its own connection and claims are done inside an
+    IMMEDIATE transaction so two workers never take the same job.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_JOBS_DB
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Connection(conn)
+
+    # -------------------- Submit / Query --------------------
+    def submit(self, bot_name: str, bot_file: str, payload: dict = None,
+               max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO jobs (bot_name, bot_file, payload, max_attempts, created_at) VALUES (?, ?, ?, ?, ?)",
+                (bot_name, bot_file, json.dumps(payload or {}), max_attempts, time.time()),
+            )
+            return cur.lastrowid
+
+    def get(self, job_id: int):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list(self, status: str = None, bot_name: str = None, limit: int = 100, before_id: int = None):
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if bot_name:
+            clauses.append("bot_name = ?")
+            params.append(bot_name)
+        if before_id:
+            clauses.append("id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY id DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [_row_to_job(r) for r in rows]
+
+    def active_job(self, bot_name: str):
+        """Newest queued or running job of a bot, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE bot_name = ? AND status IN ('queued', 'running') ORDER BY id DESC LIMIT 1",
+                (bot_name,),
+            ).fetchone()
+        return _row_to_job(row) if row else None
+
+    def is_active(self, bot_name: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM jobs WHERE bot_name = ? AND status IN ('queued', 'running') LIMIT 1", (bot_name,)
+            ).fetchone()
+        return row is not None
+
+    def request_control(self, job_id: int, control: str) -> bool:
+        """Leave a stop/pause/resume request for the owning worker. Queued jobs are stopped directly."""
+        if control not in JOB_CONTROLS:
+            raise ValueError(f"Unknown job control '{control}'")
+        with self._connect() as conn:
+            if control == "stop":
+                cur = conn.execute(
+                    "UPDATE jobs SET status = 'stopped', finished_at = ? WHERE id = ? AND status = 'queued'",
+                    (time.time(), job_id),
+                )
+                if cur.rowcount:
+                    return True
+            cur = conn.execute(
+                "UPDATE jobs SET control = ? WHERE id = ? AND status = 'running'", (control, job_id)
+            )
+            return cur.rowcount > 0
+
+    # -------------------- Worker side --------------------
+    def claim(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """Atomically take the oldest queued job whose bot is not already running."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    """
+                    SELECT * FROM jobs WHERE status = 'queued'
+                      AND bot_name NOT IN (SELECT bot_name FROM jobs WHERE status = 'running')
+                    ORDER BY id LIMIT 1
+                    """
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = 'running', worker_id = ?, lease_expires = ?,
+                           attempts = attempts + 1, started_at = ?, control = NULL, error = NULL
+                    WHERE id = ?
+                    """,
+                    (worker_id, now + lease_seconds, now, row["id"]),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """
+        Extend the lease. Returns (still_owned, pending_control) and clears the
+        control request once delivered.
+        """
+        with self._connect() as conn:
+            # Read and clear in one transaction so a control request made in between isn't lost
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT control FROM jobs WHERE id = ? AND worker_id = ? AND status = 'running'",
+                    (job_id, worker_id),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET lease_expires = ?, control = NULL WHERE id = ?",
+                        (time.time() + lease_seconds, job_id),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return False, None
+        return True, row["control"]
+
+    def finish(self, job_id: int, worker_id: str, status: str = "done", error: str = None):
+        if status not in JOB_STATUSES:
+            raise ValueError(f"Unknown job status '{status}'")
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_expires = NULL
+                WHERE id = ? AND worker_id = ? AND status = 'running'
+                """,
+                (status, error, time.time(), job_id, worker_id),
+            )
+
+    def requeue_expired(self) -> int:
+        """Return running jobs with an expired lease to the queue (or fail them when out of attempts)."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', finished_at = ?, error = 'lease expired (worker lost)'
+                WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts
+                """,
+                (now, now),
+            )
+            cur = conn.execute(
+                """
+                UPDATE jobs SET status = 'queued', worker_id = NULL, lease_expires = NULL, control = NULL
+                WHERE status = 'running' AND lease_expires < ?
+                """,
+                (now,),
+            )
+            conn.execute("COMMIT")
+            return cur.rowcount
+
+
+class _Connection:
+    """Context manager that always closes the sqlite connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.conn.close()
+        return False
+
+
+def _row_to_job(row) -> dict:
+    job = dict(row)
+    job["payload"] = json.loads(job.get("payload") or "{}")
+    return job
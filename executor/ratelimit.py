@@ -0,0 +1,156 @@
+# executor/ratelimit.py
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+RATE_LIMITS_FILE = Path("data") / "rate_limits.json"
+SHARED_DB_ENV = "BOT_RATE_LIMIT_DB"  # set to a sqlite path to share buckets across processes
+
+# rate = sustained actions per second, burst = bucket size, jitter = extra random delay (seconds)
+DEFAULT_LIMIT = {"rate": 2.0, "burst": 5, "jitter": [0.05, 0.3]}
+DEFAULT_LIMITS = {
+    "linkedin.com": {"rate": 0.5, "burst": 3, "jitter": [0.4, 1.5]},
+    "seek.com.au": {"rate": 1.0, "burst": 4, "jitter": [0.2, 0.8]},
+}
+
+
+def domain_of(url: str) -> str:
+    host = urlparse(url or "").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class _MemoryBuckets:
+    """Token buckets shared by every bot thread in this process."""
+    blocking = False
+
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, rate: float, burst: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens, delay = _take(tokens, updated, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+            return delay
+
+
+class _SQLiteBuckets:
+    """Token buckets in a local SQLite file, shared by all worker processes."""
+    blocking = True  # waits on the database lock: run off the event loop
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+        finally:
+            conn.close()
+
+    def reserve(self, key: str, rate: float, burst: float) -> float:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()  # wall clock: comparable between processes
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens, delay = _take(tokens, updated, now, rate, burst)
+            conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+            conn.execute("COMMIT")
+            return delay
+        finally:
+            conn.close()
+
+
+def _take(tokens, updated, now, rate, burst):
+    """
+    Refill, then take one token. Tokens may go negative: the caller is given
+    the time until its token exists, which queues concurrent callers fairly.
+    """
+    tokens = min(burst, tokens + (now - updated) * rate) - 1
+    delay = -tokens / rate if tokens < 0 else 0.0
+    return tokens, delay
+
+
+class RateLimiter:
+    """
+    Per-domain token-bucket limiter for navigations and page interactions.
+
+    A domain's limit applies to it and all its subdomains ("linkedin.com"
+    covers "www.linkedin.com"). Hosts without a configured limit get their
+    own bucket with DEFAULT_LIMIT. Per-bot overrides are passed to acquire()
+    and only apply to that call; they never change the shared limits.
+    """
+
+    def __init__(self, limits: dict = None, shared_db=None):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.default = dict(DEFAULT_LIMIT)
+        self._backend = _SQLiteBuckets(shared_db) if shared_db else _MemoryBuckets()
+        self._load_file()
+
+    def _load_file(self):
+        if RATE_LIMITS_FILE.exists():
+            try:
+                with open(RATE_LIMITS_FILE, "r") as f:
+                    self.configure(json.load(f))
+            except Exception as e:
+                print(f"⚠️ Could not load {RATE_LIMITS_FILE}: {e}")
+
+    def configure(self, limits: dict):
+        """Merge {domain: {rate, burst, jitter}} overrides; the "*" key replaces the default."""
+        for domain, limit in (limits or {}).items():
+            if domain == "*":
+                self.default.update(limit)
+            else:
+                self.limits[domain] = {**self.default, **self.limits.get(domain, {}), **limit}
+
+    def limit_for(self, domain: str, overrides: dict = None):
+        """Return (bucket key, limit) for a domain, with optional {domain: limit} overrides on top."""
+        default = self.default
+        if overrides and "*" in overrides:
+            default = {**default, **overrides["*"]}
+        parts = domain.split(".")
+        for i in range(len(parts) - 1):
+            key = ".".join(parts[i:])
+            if overrides and key in overrides:
+                return key, {**default, **self.limits.get(key, {}), **overrides[key]}
+            if key in self.limits:
+                return key, self.limits[key]
+        return domain, default
+
+    async def acquire(self, url: str, limits: dict = None):
+        """
+        Wait until an action against url's domain is allowed. Returns the seconds waited.
+        limits: per-run {domain: {rate, burst, jitter}} overrides (a bot's "rate_limits").
+        """
+        domain = domain_of(url)
+        if not domain:
+            return 0.0
+        key, limit = self.limit_for(domain, limits)
+        rate = float(limit.get("rate") or 0)
+        if rate <= 0:
+            return 0.0
+        burst = float(limit.get("burst", 1))
+        if self._backend.blocking:
+            # Python 3.8 has no asyncio.to_thread
+            delay = await asyncio.get_running_loop().run_in_executor(None, self._backend.reserve, key, rate, burst)
+        else:
+            delay = self._backend.reserve(key, rate, burst)
+        jitter = limit.get("jitter") or [0, 0]
+        delay += random.uniform(*jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+rate_limiter = RateLimiter(shared_db=os.environ.get(SHARED_DB_ENV))
@@ -0,0 +1,107 @@
+# executor/recorder.py
+import gzip
+import json
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_FLIGHT_DIR = Path("data") / "flight"
+DEFAULT_CAPACITY = 500
+DOM_SNIPPET_LIMIT = 200_000  # characters of page HTML kept in a dump
+RECORDER_OPTIONS = ("size", "screenshots", "dom")
+
+
+class FlightRecorder:
+    """
+    Always-on, bounded ring buffer of recent bot events.
+
+    Recording is a single deque append of a tuple; nothing is formatted or
+    written until dump() is called on error, pause-on-error or a user stop.
+    """
+    __slots__ = ("bot_name", "events", "out_dir", "screenshots", "dom", "_last_url")
+
+    def __init__(self, bot_name: str, size: int = DEFAULT_CAPACITY, screenshots: bool = True,
+                 dom: bool = True, out_dir=None):
+        self.bot_name = bot_name
+        self.events = deque(maxlen=size)
+        self.out_dir = Path(out_dir) if out_dir else DEFAULT_FLIGHT_DIR
+        self.screenshots = screenshots
+        self.dom = dom
+        self._last_url = None
+
+    @classmethod
+    def from_config(cls, bot_name: str, config: dict = None):
+        """Build from a bot's "flight_recorder" field, ignoring keys this recorder doesn't know."""
+        config = config or {}
+        unknown = set(config) - set(RECORDER_OPTIONS)
+        if unknown:
+            print(f"⚠️ Ignoring unknown flight_recorder option(s): {', '.join(sorted(unknown))}")
+        return cls(bot_name, **{k: config[k] for k in RECORDER_OPTIONS if k in config})
+
+    # -------------------- Recording (hot path) --------------------
+    def record(self, kind: str, *data):
+        self.events.append((time.time(), kind, data))
+
+    def record_url(self, url: str):
+        if url != self._last_url:
+            self._last_url = url
+            self.events.append((time.time(), "url", (url,)))
+
+    # -------------------- Dumping (cold path) --------------------
+    def snapshot(self) -> list:
+        return [
+            {"ts": ts, "kind": kind, "data": [jsonable(d) for d in data]}
+            for ts, kind, data in self.events
+        ]
+
+    async def dump(self, page=None, reason: str = "") -> Path:
+        """
+        Write buffered events (plus an optional screenshot and DOM snippet) to
+        out_dir/<bot>_<timestamp>/. Never raises; returns the dump folder or None.
+        """
+        try:
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            folder = self.out_dir / f"{self.bot_name}_{stamp}"
+            folder.mkdir(parents=True, exist_ok=True)
+
+            meta = {
+                "bot_name": self.bot_name,
+                "reason": reason,
+                "dumped_at": datetime.now().isoformat(),
+                "url": self._last_url,
+                "events": self.snapshot(),
+            }
+            with open(folder / "events.json", "w") as f:
+                json.dump(meta, f, indent=2)
+
+            if page is not None and not page.is_closed():
+                if self.screenshots:
+                    try:
+                        await page.screenshot(path=str(folder / "screenshot.jpg"), type="jpeg", quality=50)
+                    except Exception as e:
+                        print(f"⚠️ Flight recorder screenshot failed: {e}")
+                if self.dom:
+                    try:
+                        html = await page.content()
+                        with gzip.open(folder / "dom.html.gz", "wt", encoding="utf-8") as f:
+                            f.write(html[:DOM_SNIPPET_LIMIT])
+                    except Exception as e:
+                        print(f"⚠️ Flight recorder DOM capture failed: {e}")
+
+            print(f"🧾 Flight recorder dumped {len(self.events)} events to {folder} ({reason})")
+            return folder
+        except Exception as e:
+            print(f"⚠️ Flight recorder dump failed: {e}")
+            return None
+
+
+def jsonable(value):
+    """Best-effort JSON-safe copy of event data (also used for trace span args)."""
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    return repr(value)
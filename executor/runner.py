@@ -4,26 +4,77 @@ import asyncio
 import sys
 from executor.actions import ACTIONS
 from executor.conditions import CONDITIONS
+from executor.templates import CompiledState
+from executor.recorder import FlightRecorder
+from data.history import RunLogger
+from data.seen import refresh_seen_index
+from executor.ratelimit import rate_limiter
+from executor.trace import RunTrace, NULL_TRACE, Trace, TracedPage, tracing_enabled
+from executor.ratelimit import domain_of
 
-async def run_bot(bot_name: str, page, bot_file, context, pause_event: asyncio.Event, stop_event: asyncio.Event):
+async def run_bot(bot_name: str, page, bot_file, context, pause_event: asyncio.Event, stop_event: asyncio.Event,
+                  recorder: FlightRecorder = None, run_log: RunLogger = None):
     """
     Executes bot states, respecting PAUSE and STOP events.
     pause_event: cleared = paused, set = running
     stop_event: set = stop requested
+    recorder: flight recorder dumped on error / user stop (built from bot["flight_recorder"] if omitted)
+    run_log: run history logger (nothing is persisted if omitted)
+    A Chrome trace-event timeline is written to data/traces/ when bot["trace"] is true or BOT_TRACE=1.
     """
     # -------------------- Load bot --------------------
     with open(bot_file, "r") as f:
         bot = json.load(f)
 
+    context.data["bot_name"] = bot_name
+    refresh_seen_index()  # pick up items other processes marked since the last run
+    if recorder is None:
+        recorder = FlightRecorder.from_config(bot_name, bot.get("flight_recorder"))
+    if run_log is None:
+        run_log = RunLogger(None, None, bot_name)
+    trace = RunTrace(bot_name) if tracing_enabled(bot) else NULL_TRACE
+    if isinstance(trace, RunTrace):
+        page = TracedPage(page, trace)
+    context.data["trace"] = trace  # lets rate-limited actions time their waits separately
+
+    try:
+        await _execute_states(bot, page, context, pause_event, stop_event, recorder, run_log, trace)
+    except asyncio.CancelledError:
+        run_log.info("Run cancelled by STOP")
+        await recorder.dump(page, "stop")
+        raise
+    except Exception as e:
+        run_log.error(f"Unhandled error: {e}")
+        recorder.record("error", repr(e))
+        await recorder.dump(page, "error")
+        raise
+    finally:
+        try:
+            trace.save(run_log.run_id)
+        except Exception as e:
+            print(f"⚠️ Failed to write trace: {e}")
+
+async def _execute_states(bot: dict, page, context, pause_event: asyncio.Event, stop_event: asyncio.Event,
+                          recorder: FlightRecorder, run_log: RunLogger, trace: Trace):
     states = {s["id"]: s for s in bot.get("states", [])}
     state_order = bot.get("states", [])  # preserve UI/memory order
+    compiled_states = {s["id"]: CompiledState(s) for s in state_order}  # parse {{var}} templates once
+    for key, value in bot.get("variables", {}).items():
+        if key not in context:  # variables passed in (e.g. a job payload) win over the bot's defaults
+            context.set(key, value)
     current_state_index = 0
 
     # -------------------- Navigate to start_url --------------------
     start_url = bot.get("start_url") or "https://example.com"
+    # Per-bot rate limit overrides apply to this run only (actions read them from context.data)
+    context.data["rate_limits"] = bot.get("rate_limits")
     print(f"🌐 Navigating to start URL: {start_url}")
-    await page.goto(start_url)
-    await page.goto(start_url, wait_until='domcontentloaded')
+    run_log.info("Navigating to start URL", url=start_url)
+    with trace.span(f"ratelimit {domain_of(start_url)}", "ratelimit"):
+        await rate_limiter.acquire(start_url, context.data["rate_limits"])
+    with trace.span("start_url", "navigation", url=start_url):
+        await page.goto(start_url)
+        await page.goto(start_url, wait_until='domcontentloaded')
     await asyncio.sleep(1)
     print("✅ Page loaded, starting states execution")
 
@@ -34,93 +85,133 @@ async def run_bot(bot_name: str, page, bot_file, context, pause_event: asyncio.E
         while True:
             if stop_event.is_set():
                 print("🛑 STOP received during idle pause, exiting")
+                await recorder.dump(page, "stop")
                 await page.context.close()
                 return
             await asyncio.sleep(0.1)
 
     # -------------------- State Execution Loop --------------------
+    scoped = False  # a with_vars frame is open for the previous state
     while current_state_index < len(state_order):
-        state = state_order[current_state_index]
-        state_id = state["id"]
+        if scoped:
+            context.pop_frame()
+            scoped = False
+        state_id = state_order[current_state_index]["id"]
+        compiled_state = compiled_states[state_id]
 
         # -------------------- Check for STOP before action --------------------
         if stop_event.is_set():
             print(f"🛑 STOP requested before state {state_id}, exiting")
+            await recorder.dump(page, "stop")
             await page.context.close()
             # await page.browser.close()
             return
 
         # -------------------- Wait if PAUSED --------------------
-        while not pause_event.is_set():
-            if stop_event.is_set():
-                print(f"🛑 STOP received during PAUSE at state {state_id}, exiting")
-                await page.context.close()
-                # await page.browser.close()
-                return
-            await asyncio.sleep(0.1)
+        if not pause_event.is_set():
+            with trace.span("pause", "pause", state=state_id):
+                while not pause_event.is_set():
+                    if stop_event.is_set():
+                        print(f"🛑 STOP received during PAUSE at state {state_id}, exiting")
+                        await recorder.dump(page, "stop")
+                        await page.context.close()
+                        # await page.browser.close()
+                        return
+                    await asyncio.sleep(0.1)
 
+        with_vars = compiled_state.render_with_vars(context)
+        if with_vars:
+            context.push_frame(with_vars)
+            scoped = True
+        state = compiled_state.render(context)
+        state_span = trace.start(f"state {state_id}", "state", action=state["action"])
+        recorder.record("state", state_id, state["action"])
         print(f"\n🔹 Executing state {state_id} -> {state['action']}")
 
-        # -------------------- Execute Action --------------------
-        try:
-            action_func = ACTIONS.get(state["action"])
-            if action_func:
-                await action_func(page, state, context)
-                print(f"✅ Action '{state['action']}' executed successfully")
-            else:
-                print(f"⚠️ Action '{state['action']}' not found, skipping state")
-        except Exception as e:
-            print(f"❌ Error in action '{state['action']}' at state {state_id}: {e}")
-            print("⏸ Pausing bot due to error")
-            # PAUSE until manually resumed or stopped
-            pause_event.clear()
-            while not pause_event.is_set():
-                if stop_event.is_set():
-                    print(f"🛑 STOP received during error pause at state {state_id}, exiting")
-                    await page.context.close()
-                    # await page.browser.close()
-                    return
-                await asyncio.sleep(0.1)
-            # After resume, continue to next iteration
-            continue
-
-        # -------------------- Evaluate Transitions --------------------
         next_state_id = None
-        transitions = state.get("transitions", [])
-        if not transitions:
-            print(f"ℹ️ No transitions defined for state {state_id}")
-
-        for t in transitions:
-            cond_name = t.get("condition")
-            cond_func = CONDITIONS.get(cond_name)
-            params = {k: v for k, v in t.items() if k not in ("condition", "next")}
-            if not cond_func:
-                print(f"⚠️ Condition '{cond_name}' not found, skipping")
-                continue
+        try:
+            # -------------------- Execute Action --------------------
             try:
-                cond_result = await cond_func(page, context, **params)
-                print(f"➡️ Condition '{cond_name}' evaluated with params {params} -> {cond_result}")
-                if cond_result:
-                    next_state_id = t.get("next")
-                    print(f"🎯 Transition matched: next_state_id = {next_state_id}")
-                    break
+                action_func = ACTIONS.get(state["action"])
+                if action_func:
+                    with trace.span(f"action {state['action']}", "action"):
+                        await action_func(page, state, context)
+                    recorder.record_url(page.url)
+                    run_log.states_executed += 1
+                    print(f"✅ Action '{state['action']}' executed successfully")
+                else:
+                    print(f"⚠️ Action '{state['action']}' not found, skipping state")
             except Exception as e:
-                print(f"⚠️ Error evaluating condition '{cond_name}' with params {params}: {e}")
+                print(f"❌ Error in action '{state['action']}' at state {state_id}: {e}")
+                print("⏸ Pausing bot due to error")
+                run_log.error(f"Action '{state['action']}' failed: {e}", state=state_id, url=page.url)
+                recorder.record("action_error", state_id, state["action"], repr(e))
+                recorder.record_url(page.url)
+                await recorder.dump(page, "pause_on_error")
+                state_span.end(error=repr(e))
+                # PAUSE until manually resumed or stopped
+                pause_event.clear()
+                with trace.span("pause", "pause", state=state_id, reason="error"):
+                    while not pause_event.is_set():
+                        if stop_event.is_set():
+                            print(f"🛑 STOP received during error pause at state {state_id}, exiting")
+                            await recorder.dump(page, "stop")
+                            await page.context.close()
+                            # await page.browser.close()
+                            return
+                        await asyncio.sleep(0.1)
+                # After resume, continue to next iteration
                 continue
 
+            # -------------------- Evaluate Transitions --------------------
+            if not compiled_state.transitions:
+                print(f"ℹ️ No transitions defined for state {state_id}")
+
+            for cond_name, t_next, params in compiled_state.render_transitions(context):
+                cond_func = CONDITIONS.get(cond_name)
+                if not cond_func:
+                    print(f"⚠️ Condition '{cond_name}' not found, skipping")
+                    continue
+                cond_span = trace.start(f"condition {cond_name}", "condition", params=params)
+                try:
+                    cond_result = await cond_func(page, context, **params)
+                    cond_span.end(result=bool(cond_result))
+                    recorder.record("condition", state_id, cond_name, params, bool(cond_result))
+                    print(f"➡️ Condition '{cond_name}' evaluated with params {params} -> {cond_result}")
+                    if cond_result:
+                        next_state_id = t_next
+                        print(f"🎯 Transition matched: next_state_id = {next_state_id}")
+                        break
+                except Exception as e:
+                    cond_span.end(error=repr(e))
+                    recorder.record("condition_error", state_id, cond_name, params, repr(e))
+                    print(f"⚠️ Error evaluating condition '{cond_name}' with params {params}: {e}")
+                    run_log.warning(f"Condition '{cond_name}' raised: {e}", state=state_id)
+                    continue
+                finally:
+                    cond_span.end()
+        finally:
+            # No-op if already ended on the error path; also closes the span when the run is cancelled
+            state_span.end(next=next_state_id)
+
         # -------------------- Handle Next State --------------------
+        recorder.record("transition", state_id, next_state_id)
         if next_state_id in ["pause", "PAUSE", "Pause"] or (next_state_id not in states and next_state_id != "STOP"):
             print(f"⏸ Pause triggered at state {state_id} (next: {next_state_id})")
+            run_log.info("Paused", state=state_id, next=next_state_id)
             pause_event.clear()
-            while not pause_event.is_set():
-                if stop_event.is_set():
-                    print(f"🛑 STOP received during pause at state {state_id}, exiting")
-                    await page.context.close()
-                    # await page.browser.close()
-                    return
-                await asyncio.sleep(0.1)
+            with trace.span("pause", "pause", state=state_id, next=next_state_id):
+                while not pause_event.is_set():
+                    if stop_event.is_set():
+                        print(f"🛑 STOP received during pause at state {state_id}, exiting")
+                        await recorder.dump(page, "stop")
+                        await page.context.close()
+                        # await page.browser.close()
+                        return
+                    await asyncio.sleep(0.1)
         elif next_state_id == "STOP":
             print(f"🛑 STOP triggered at state {state_id}, closing browser and exiting")
+            run_log.info("STOP transition reached", state=state_id)
             await page.context.close()
             # await page.browser.close()
             return
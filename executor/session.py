@@ -1,42 +1,144 @@
 # executor/session.py
+import os
 from pathlib import Path
 from playwright.async_api import async_playwright
 
 DEFAULT_USER_DATA_DIR = Path("user_data")
 
-async def launch_persistent_context(bot_name: str, headless: bool = False, user_agent: str = None, args: list = None):
+# Flags every profile gets
+BASE_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-features=TranslateUI",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-popup-blocking",
+    "--disable-session-crashed-bubble",
+    "--disable-infobars",
+    "--disable-web-security",
+]
+
+# Named launch profiles, selected per bot with "launch_profile" (and tweaked with "launch")
+LAUNCH_PROFILES = {
+    # Lean production default: no window, small viewport, no GPU / compositor work
+    "headless": {
+        "headless": True,
+        "viewport": {"width": 1280, "height": 800},
+        "device_scale_factor": 1,
+        "locale": "en-US",
+        "args": [
+            "--disable-gpu",
+            "--disable-features=VizDisplayCompositor",
+            "--mute-audio",
+            "--hide-scrollbars",
+        ],
+    },
+    # Visible full-HD window, for building bots and manual steps (logins, captchas)
+    "headed": {
+        "headless": False,
+        "viewport": {"width": 1920, "height": 1080},
+        "device_scale_factor": 1,
+        "locale": "en-US",
+        "args": [
+            "--disable-features=VizDisplayCompositor",
+            "--start-maximized",
+            "--window-size=1920,1080",
+        ],
+    },
+    "mobile": {
+        "headless": True,
+        "viewport": {"width": 390, "height": 844},
+        "device_scale_factor": 3,
+        "is_mobile": True,
+        "has_touch": True,
+        "locale": "en-US",
+        "user_agent": (
+            "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 "
+            "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+        ),
+        "args": ["--disable-gpu", "--mute-audio"],
+    },
+}
+
+DEFAULT_LAUNCH_PROFILE = os.environ.get("BOT_LAUNCH_PROFILE", "headless")
+if DEFAULT_LAUNCH_PROFILE not in LAUNCH_PROFILES:
+    print(f"⚠️ Unknown BOT_LAUNCH_PROFILE '{DEFAULT_LAUNCH_PROFILE}' "
+          f"(available: {', '.join(LAUNCH_PROFILES)}), using 'headless'")
+    DEFAULT_LAUNCH_PROFILE = "headless"
+
+# Chromium only honours the last of each of these flags, so their values are merged into one
+LIST_FLAGS = ("--disable-features=", "--enable-features=")
+
+# Keys passed through to chromium.launch_persistent_context
+LAUNCH_OPTIONS = ("headless", "viewport", "device_scale_factor", "is_mobile", "has_touch",
+                  "locale", "timezone_id", "user_agent")
+
+
+def resolve_launch_profile(profile=None, overrides: dict = None) -> dict:
+    """
+    Build launch settings from a profile name (or dict) plus per-bot overrides.
+    Override "args" are appended to the profile's flags rather than replacing them.
+    """
+    if isinstance(profile, dict):
+        settings = dict(profile)
+    else:
+        name = profile or DEFAULT_LAUNCH_PROFILE
+        if name not in LAUNCH_PROFILES:
+            raise ValueError(f"Unknown launch profile '{name}' (available: {', '.join(LAUNCH_PROFILES)})")
+        settings = dict(LAUNCH_PROFILES[name])
+    for key, value in (overrides or {}).items():
+        if key == "args":
+            settings["args"] = list(settings.get("args", [])) + list(value)
+        else:
+            settings[key] = value
+    return settings
+
+
+def merge_list_flags(args: list) -> list:
+    """Combine repeated --disable-features= / --enable-features= flags into one each (first position kept)."""
+    merged, values = [], {}
+    for arg in args:
+        prefix = next((p for p in LIST_FLAGS if arg.startswith(p)), None)
+        if prefix is None:
+            merged.append(arg)
+            continue
+        if prefix not in values:
+            values[prefix] = []
+            merged.append(prefix)
+        for feature in arg[len(prefix):].split(","):
+            if feature and feature not in values[prefix]:
+                values[prefix].append(feature)
+    return [arg + ",".join(values[arg]) if arg in values else arg for arg in merged]
+
+
+async def launch_persistent_context(bot_name: str, headless: bool = None, user_agent: str = None,
+                                    args: list = None, profile=None, overrides: dict = None):
+    settings = resolve_launch_profile(profile, overrides)
+    if headless is not None:
+        settings["headless"] = headless
+    if user_agent:
+        settings["user_agent"] = user_agent
+    if args:
+        settings["args"] = list(settings.get("args", [])) + list(args)
+
     user_data_dir = DEFAULT_USER_DATA_DIR / bot_name
     user_data_dir.mkdir(parents=True, exist_ok=True)
 
     playwright = await async_playwright().start()
     chromium = playwright.chromium
 
+    options = {k: settings[k] for k in LAUNCH_OPTIONS if settings.get(k) is not None}
     context = await chromium.launch_persistent_context(
         user_data_dir=str(user_data_dir),
-        headless=headless,
-        user_agent=user_agent,
-        viewport=None,  # allow real window size
-        args=[
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            "--disable-blink-features=AutomationControlled",
-            "--disable-background-timer-throttling",
-            "--disable-backgrounding-occluded-windows",
-            "--disable-renderer-backgrounding",
-            "--disable-features=TranslateUI,VizDisplayCompositor",
-            "--disable-default-apps",
-            "--disable-extensions",
-            "--disable-popup-blocking",
-            "--disable-session-crashed-bubble",
-            "--disable-infobars",
-            "--lang=en-US,en",
-            "--start-maximized",
-            "--window-size=1920,1080",
-            "--disable-web-security",
-        ],
+        args=merge_list_flags(BASE_ARGS + [f"--lang={settings.get('locale', 'en-US')}"] + list(settings.get("args", []))),
+        **options,
     )
 
-    page = await context.new_page()
-    await page.set_viewport_size({"width": 1920, "height": 1080})  # 🔑 force HTML scaling
+    # Persistent contexts open with one blank page; reuse it instead of spawning a second one
+    page = context.pages[0] if context.pages else await context.new_page()
 
     return playwright, context, page
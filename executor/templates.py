@@ -0,0 +1,122 @@
+# executor/templates.py
+import re
+
+# {{ name }} or {{ name | fallback }}. Names are flat context keys: anything else
+# (e.g. a dotted path) is left as literal text so the mistake shows up in the page.
+TEMPLATE_RE = re.compile(r"\{\{\s*([A-Za-z_]\w*)\s*(?:\|\s*(.*?)\s*)?\}\}")
+
+# State keys that are never templated (they drive the state machine itself)
+STATIC_STATE_KEYS = ("id", "action", "alias", "transitions", "with_vars")
+
+
+class Template:
+    """
+    A string with {{var}} placeholders, parsed once into literal/variable parts.
+    A template that is exactly one placeholder renders to the raw (typed) value.
+    """
+    __slots__ = ("source", "parts", "single")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = []
+        pos = 0
+        for m in TEMPLATE_RE.finditer(source):
+            if m.start() > pos:
+                parts.append(source[pos:m.start()])
+            parts.append((m.group(1), m.group(2)))
+            pos = m.end()
+        if pos < len(source):
+            parts.append(source[pos:])
+        self.parts = tuple(parts)
+        self.single = len(parts) == 1 and isinstance(parts[0], tuple)
+
+    def render(self, context):
+        if self.single:
+            name, fallback = self.parts[0]
+            return context.get(name, fallback if fallback is not None else "")
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+            else:
+                name, fallback = part
+                value = context.get(name, fallback)
+                out.append("" if value is None else str(value))
+        return "".join(out)
+
+    def __repr__(self):
+        return f"Template({self.source!r})"
+
+
+def compile_value(value):
+    """
+    Recursively compile strings containing placeholders into Templates.
+    Returns (compiled, is_dynamic); static values are returned untouched.
+    """
+    if isinstance(value, str):
+        if "{{" in value and TEMPLATE_RE.search(value):
+            return Template(value), True
+        return value, False
+    if isinstance(value, list):
+        items = [compile_value(v) for v in value]
+        if any(dyn for _, dyn in items):
+            return [c for c, _ in items], True
+        return value, False
+    if isinstance(value, dict):
+        items = {k: compile_value(v) for k, v in value.items()}
+        if any(dyn for _, dyn in items.values()):
+            return {k: c for k, (c, _) in items.items()}, True
+        return value, False
+    return value, False
+
+
+def render_value(value, context):
+    if isinstance(value, Template):
+        return value.render(context)
+    if isinstance(value, list):
+        return [render_value(v, context) for v in value]
+    if isinstance(value, dict):
+        return {k: render_value(v, context) for k, v in value.items()}
+    return value
+
+
+class CompiledState:
+    """
+    A bot state with its templated fields pre-parsed.
+    Static states render to the original dict without copying.
+    """
+    __slots__ = ("state", "dynamic", "transitions", "with_vars")
+
+    def __init__(self, state: dict):
+        self.state = state
+        # State-scoped variables, rendered against the enclosing scope
+        self.with_vars = compile_value(state["with_vars"])[0] if state.get("with_vars") else None
+        self.dynamic = {}
+        for key, value in state.items():
+            if key in STATIC_STATE_KEYS:
+                continue
+            compiled, is_dynamic = compile_value(value)
+            if is_dynamic:
+                self.dynamic[key] = compiled
+
+        # Transition params (everything but condition/next) may be templated too
+        self.transitions = []
+        for t in state.get("transitions", []):
+            params = {k: v for k, v in t.items() if k not in ("condition", "next")}
+            compiled, is_dynamic = compile_value(params)
+            self.transitions.append((t.get("condition"), t.get("next"), compiled, is_dynamic))
+
+    def render_with_vars(self, context):
+        return render_value(self.with_vars, context) if self.with_vars else None
+
+    def render(self, context) -> dict:
+        if not self.dynamic:
+            return self.state
+        rendered = dict(self.state)
+        for key, compiled in self.dynamic.items():
+            rendered[key] = render_value(compiled, context)
+        return rendered
+
+    def render_transitions(self, context):
+        for cond_name, next_state_id, params, is_dynamic in self.transitions:
+            yield cond_name, next_state_id, (render_value(params, context) if is_dynamic else params)
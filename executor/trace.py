@@ -0,0 +1,168 @@
+# executor/trace.py
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+
+from executor.recorder import jsonable
+
+DEFAULT_TRACE_DIR = Path("data") / "traces"
+TRACE_ENV = "BOT_TRACE"  # set to 1 to trace every run
+
+
+class Span:
+    __slots__ = ("trace", "name", "cat", "start", "args", "ended")
+
+    def __init__(self, trace, name, cat, args):
+        self.trace = trace
+        self.name = name
+        self.cat = cat
+        self.start = time.perf_counter()
+        self.args = args
+        self.ended = False
+
+    def end(self, **args):
+        """Record the span. Only the first call counts, so a finally: end() is safe after an explicit end."""
+        if self.ended:
+            return
+        self.ended = True
+        if args:
+            self.args = {**(self.args or {}), **args}
+        self.trace._complete(self.name, self.cat, self.start, time.perf_counter(), self.args)
+
+
+class RunTrace:
+    """
+    Timeline of one bot run in Chrome trace-event format.
+
+    Open the saved JSON in chrome://tracing or https://ui.perfetto.dev.
+    Spans are "X" (complete) events with microsecond timestamps relative to
+    the start of the run.
+    """
+
+    def __init__(self, bot_name: str, out_dir=None):
+        self.bot_name = bot_name
+        self.out_dir = Path(out_dir) if out_dir else DEFAULT_TRACE_DIR
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self.started = datetime.now()
+        self._t0 = time.perf_counter()
+        self.events = [
+            {"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": f"bot {bot_name}"}},
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": self.tid, "args": {"name": "run_bot"}},
+        ]
+
+    def _us(self, t: float) -> float:
+        return round((t - self._t0) * 1_000_000, 1)
+
+    def _complete(self, name, cat, start, end, args):
+        event = {"name": name, "cat": cat, "ph": "X", "ts": self._us(start), "dur": round((end - start) * 1_000_000, 1),
+                 "pid": self.pid, "tid": self.tid}
+        if args:
+            event["args"] = jsonable(args)
+        self.events.append(event)
+
+    def start(self, name: str, cat: str, **args) -> Span:
+        return Span(self, name, cat, args or None)
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args):
+        s = Span(self, name, cat, args or None)
+        try:
+            yield s
+        finally:
+            s.end()
+
+    def save(self, run_id=None) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        suffix = run_id if run_id is not None else self.started.strftime("%Y%m%d-%H%M%S")
+        path = self.out_dir / f"{self.bot_name}_{suffix}.json"
+        with open(path, "w") as f:
+            json.dump({
+                "traceEvents": self.events,
+                "displayTimeUnit": "ms",
+                "otherData": {"bot_name": self.bot_name, "started_at": self.started.isoformat(), "run_id": run_id},
+            }, f)
+        print(f"🧭 Trace written to {path}")
+        return path
+
+
+class NullTrace:
+    """Stand-in used when tracing is off: every call is a no-op."""
+    _span = nullcontext()
+
+    def start(self, name, cat, **args):
+        return _NULL_SPAN
+
+    def span(self, name, cat, **args):
+        return self._span
+
+    def save(self, run_id=None):
+        return None
+
+
+class _NullSpan:
+    def end(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+NULL_TRACE = NullTrace()
+
+Trace = Union[RunTrace, NullTrace]
+
+
+def tracing_enabled(bot: dict) -> bool:
+    return bool(bot.get("trace")) or os.environ.get(TRACE_ENV, "") not in ("", "0")
+
+
+# ----------------------------- Page instrumentation -----------------------------
+class TracedLocator:
+    def __init__(self, locator, trace, selector):
+        self._locator = locator
+        self._trace = trace
+        self._selector = selector
+
+    async def wait_for(self, *args, **kwargs):
+        with self._trace.span(f"wait_for {self._selector}", "selector", state=kwargs.get("state")):
+            return await self._locator.wait_for(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._locator, name)
+
+
+class TracedPage:
+    """
+    Wraps a Playwright page so navigations and selector lookups show up as
+    spans; everything else is passed straight through.
+    """
+    _SELECTOR_METHODS = ("query_selector", "query_selector_all", "wait_for_selector", "click", "fill",
+                         "hover", "inner_text")
+    _NAVIGATION_METHODS = ("goto", "wait_for_load_state", "reload", "go_back")
+
+    def __init__(self, page, trace: Trace):
+        self._page = page
+        self._trace = trace
+
+    def locator(self, selector, *args, **kwargs):
+        return TracedLocator(self._page.locator(selector, *args, **kwargs), self._trace, selector)
+
+    def __getattr__(self, name):
+        attr = getattr(self._page, name)
+        if name in self._SELECTOR_METHODS:
+            cat = "selector"
+        elif name in self._NAVIGATION_METHODS:
+            cat = "navigation"
+        else:
+            return attr
+        trace = self._trace
+
+        async def traced(*args, **kwargs):
+            label = f"{name} {args[0]}" if args else name
+            with trace.span(label, cat):
+                return await attr(*args, **kwargs)
+        return traced
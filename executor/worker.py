@@ -0,0 +1,132 @@
+# executor/worker.py
+import asyncio
+import multiprocessing
+import os
+import socket
+import time
+
+from executor.jobs import JobQueue, DEFAULT_LEASE_SECONDS
+from executor.ratelimit import SHARED_DB_ENV
+
+DEFAULT_WORKER_CONCURRENCY = 2   # bots (browsers) per worker process
+SHARED_RATE_LIMIT_DB = "data/ratelimit.db"
+POLL_INTERVAL = 1.0              # seconds between claim / heartbeat rounds
+
+
+# ----------------------------- Worker Process -----------------------------
+async def _worker_loop(worker_id: str, queue: JobQueue, concurrency: int, lease_seconds: float):
+    from executor.api import BotRunner  # heavy import (Flask, Playwright) only inside the worker
+
+    loop = asyncio.get_running_loop()
+
+    def db(func, *args):
+        # Queue calls may wait on the SQLite lock: keep them off the loop that drives the browsers
+        return loop.run_in_executor(None, func, *args)
+
+    active = {}  # job_id -> (runner, task)
+    print(f"👷 Worker {worker_id} ready (concurrency={concurrency})")
+
+    while True:
+        # -------------------- Claim new work --------------------
+        while len(active) < concurrency:
+            job = await db(queue.claim, worker_id, lease_seconds)
+            if not job:
+                break
+            print(f"👷 Worker {worker_id} claimed job {job['id']} ({job['bot_name']}, attempt {job['attempts']})")
+            runner = BotRunner(job["bot_name"], job["bot_file"], job_id=job["id"],
+                               variables=job["payload"].get("variables"))
+            active[job["id"]] = (runner, asyncio.create_task(runner.run()))
+
+        # -------------------- Reap / heartbeat running jobs --------------------
+        for job_id, (runner, task) in list(active.items()):
+            if task.done():
+                active.pop(job_id)
+                if task.cancelled():
+                    await db(queue.finish, job_id, worker_id, "stopped")
+                elif task.exception():
+                    print(f"❌ Job {job_id} failed: {task.exception()}")
+                    await db(queue.finish, job_id, worker_id, "failed", repr(task.exception()))
+                else:
+                    if runner.error:
+                        print(f"❌ Job {job_id} failed: {runner.error}")
+                    await db(queue.finish, job_id, worker_id, runner.status or "done", runner.error)
+                continue
+
+            owned, control = await db(queue.heartbeat, job_id, worker_id, lease_seconds)
+            if not owned:
+                print(f"⚠️ Lost lease on job {job_id}, stopping local run")
+                runner.stop()
+                runner.resume()
+            elif control == "stop":
+                runner.stop()
+                runner.resume()  # make sure it isn't stuck paused
+            elif control == "pause":
+                runner.pause()
+            elif control == "resume":
+                runner.resume()
+
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+def worker_main(worker_id: str, db_path=None, concurrency: int = DEFAULT_WORKER_CONCURRENCY,
+                lease_seconds: float = DEFAULT_LEASE_SECONDS):
+    """Entry point of a worker process: owns its own event loop and browsers."""
+    queue = JobQueue(db_path)
+    try:
+        asyncio.run(_worker_loop(worker_id, queue, concurrency, lease_seconds))
+    except KeyboardInterrupt:
+        pass
+
+
+# ----------------------------- Coordinator -----------------------------
+class WorkerPool:
+    """
+    Spawns worker processes, restarts any that die and re-queues jobs whose
+    lease expired. Call monitor() periodically from the main process.
+    """
+
+    def __init__(self, num_workers: int = None, db_path=None, concurrency: int = DEFAULT_WORKER_CONCURRENCY,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.queue = JobQueue(db_path)
+        self.processes = {}  # worker_id -> Process
+        # Playwright and Flask threads don't survive fork(); always spawn fresh interpreters
+        self._mp = multiprocessing.get_context("spawn")
+        # Workers inherit the environment: make them share per-domain rate-limit buckets
+        os.environ.setdefault(SHARED_DB_ENV, SHARED_RATE_LIMIT_DB)
+
+    def _spawn(self, index: int):
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-w{index}-{int(time.time())}"
+        proc = self._mp.Process(
+            target=worker_main,
+            args=(worker_id, self.db_path, self.concurrency, self.lease_seconds),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+        proc.start()
+        self.processes[index] = proc
+        print(f"🚀 Started worker {index} (pid {proc.pid})")
+
+    def start(self):
+        self.queue.requeue_expired()
+        for i in range(self.num_workers):
+            self._spawn(i)
+
+    def monitor(self):
+        for i, proc in list(self.processes.items()):
+            if not proc.is_alive():
+                print(f"💥 Worker {i} exited with code {proc.exitcode}, restarting")
+                self._spawn(i)
+        requeued = self.queue.requeue_expired()
+        if requeued:
+            print(f"🔁 Re-queued {requeued} job(s) with expired leases")
+
+    def stop(self, timeout: float = 10):
+        for proc in self.processes.values():
+            proc.terminate()
+        for proc in self.processes.values():
+            proc.join(timeout)
+        self.processes.clear()
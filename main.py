@@ -1,18 +1,22 @@
+import argparse
 import asyncio
 import threading
 import time
 import webbrowser
 from pathlib import Path
-from flask import Flask, send_from_directory
+from flask import Flask
 from executor.api import register_api_routes
+from executor.http_cache import StaticAssets, compress_response
+from data.history import RunHistory
 
 # ----------------------------- Flask App -----------------------------
 app = Flask(
     __name__,
     template_folder="ui/templates",
-    static_folder="ui",
-    static_url_path="",
+    static_folder=None,  # ui/ is served below with fingerprinted, cacheable URLs
 )
+app.after_request(compress_response)
+ui_assets = StaticAssets("ui")
 
 # ----------------------------- Globals -----------------------------
 running_bots = {}  # bot_name -> BotRunner instance
@@ -21,14 +25,11 @@ bot_threads = {}   # bot_name -> Thread instance
 # ----------------------------- UI Routes -----------------------------
 @app.route("/")
 def index():
-    return send_from_directory("ui", "index.html")
+    return ui_assets.serve("index.html")
 
 @app.route("/<path:filename>")
 def serve_ui_files(filename):
-    return send_from_directory("ui", filename)
-
-# ----------------------------- Register API -----------------------------
-register_api_routes(app, running_bots, bot_threads)
+    return ui_assets.serve(filename)
 
 # ----------------------------- Browser Helpers -----------------------------
 def open_dashboard():
@@ -41,13 +42,40 @@ def run_flask():
     app.run(debug=False, host="0.0.0.0", port=5000, use_reloader=False)
 
 # ----------------------------- Main -----------------------------
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bot Framework server")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="run bots in N worker processes fed by the local job queue (0 = in-process threads)")
+    parser.add_argument("--worker-concurrency", type=int, default=2,
+                        help="bots each worker process runs at once")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("🤖 Bot Framework Server Starting...")
     
     # Ensure necessary folders exist
     Path("bots").mkdir(exist_ok=True)
     Path("user_data").mkdir(exist_ok=True)
+
+    # Migrate legacy data/logs.json and apply run-history retention
+    history = RunHistory()
+    imported = history.import_legacy_logs()
+    if imported:
+        print(f"📦 Imported {imported} legacy log entries into {history.db_path}")
+    history.prune()
+    last_prune = time.time()
     
+    # Register API (start/stop go through the job queue in worker mode)
+    register_api_routes(app, running_bots, bot_threads, worker_mode=args.workers > 0)
+
+    # Start worker pool (coordinator mode)
+    pool = None
+    if args.workers > 0:
+        from executor.worker import WorkerPool
+        pool = WorkerPool(args.workers, concurrency=args.worker_concurrency)
+        pool.start()
+
     # Start Flask in a separate thread
     flask_thread = threading.Thread(target=run_flask)
     flask_thread.daemon = True
@@ -61,8 +89,15 @@ def main():
     try:
         while True:
             time.sleep(1)
+            if pool:
+                pool.monitor()
+            if time.time() - last_prune > 3600:
+                history.prune()
+                last_prune = time.time()
     except KeyboardInterrupt:
         print("⌨️ Shutting down...")
+        if pool:
+            pool.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+import pytest
+
+from executor.bot_store import BotStore, PatchError, RevisionConflict, apply_ops
+
+
+def make_bot():
+    return {"bot_name": "b", "states": [{"id": "s1", "action": "click"}, {"id": "s2", "action": "fill"}]}
+
+
+def test_apply_ops():
+    bot = make_bot()
+    apply_ops(bot, [
+        {"op": "set", "fields": {"start_url": "https://example.com", "revision": 99}},
+        {"op": "add_state", "state": {"id": "s3", "action": "hover"}, "index": 0},
+        {"op": "update_state", "id": "s1", "fields": {"value": "x"}},
+        {"op": "set_state", "id": "s2", "state": {"id": "s2", "action": "navigate_to"}},
+        {"op": "remove_state", "id": "s3"},
+        {"op": "reorder", "order": ["s2", "s1"]},
+    ])
+    assert bot["start_url"] == "https://example.com"
+    assert "revision" not in bot
+    assert bot["states"] == [{"id": "s2", "action": "navigate_to"}, {"id": "s1", "action": "click", "value": "x"}]
+
+
+@pytest.mark.parametrize("op", [
+    "set",
+    {"op": "set", "fields": ["x"]},
+    {"op": "add_state", "state": "s3"},
+    {"op": "add_state", "state": {"id": "s3"}, "index": "0"},
+    {"op": "set_state", "id": "s1", "state": {"id": "renamed"}},
+    {"op": "update_state", "id": "s1", "fields": None},
+    {"op": "update_state", "id": "s1", "fields": {"id": "renamed"}},
+    {"op": "remove_state", "id": "missing"},
+    {"op": "reorder", "order": [["s1"], "s2"]},
+    {"op": "reorder", "order": ["s1", "s1"]},
+    {"op": "rename"},
+])
+def test_malformed_ops_raise_patch_error(op):
+    with pytest.raises(PatchError):
+        apply_ops(make_bot(), [op])
+
+
+def test_patch_checks_revision(tmp_path):
+    store = BotStore(tmp_path / "bots", tmp_path / "history")
+    assert store.save("b.json", make_bot(), 0) == 1
+    assert store.patch("b.json", [{"op": "remove_state", "id": "s2"}], 1) == 2
+    with pytest.raises(RevisionConflict):
+        store.patch("b.json", [{"op": "remove_state", "id": "s1"}], 1)
+    with pytest.raises(PatchError):
+        store.patch("b.json", [{"op": "remove_state", "id": "s1"}, {"op": "bogus"}], 2)
+    store.flush()
+    assert [s["id"] for s in store._entry("b.json").bot["states"]] == ["s1"]
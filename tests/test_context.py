@@ -0,0 +1,50 @@
+import pytest
+
+from data.context import Context
+
+
+def test_frames_shadow_and_restore():
+    ctx = Context({"term": "python"})
+    with ctx.frame({"term": "remote python"}):
+        assert ctx.get("term") == "remote python"
+        assert ctx.variables == {"term": "remote python"}
+    assert ctx.get("term") == "python"
+    assert len(ctx) == 1
+
+
+def test_set_inside_frame_outlives_it_unless_scoped():
+    ctx = Context({"page": 1})
+    with ctx.frame({"term": "x"}):
+        ctx.set("page", 2)
+        ctx.set("found", True)
+        ctx.set("term", "y")
+        assert ctx["term"] == "y"
+    assert ctx.get("page") == 2
+    assert ctx.get("found") is True
+    assert "term" not in ctx
+
+
+def test_limits():
+    ctx = Context(max_vars=2, max_frames=2, max_value_length=3)
+    ctx.set("a", "abcdef")
+    assert ctx.get("a") == "abc"
+    ctx.set("b", object())
+    assert isinstance(ctx.get("b"), str)
+    with pytest.raises(ValueError):
+        ctx.set("c", 1)
+    ctx.push_frame()
+    with pytest.raises(ValueError):
+        ctx.push_frame()
+    ctx.pop_frame()
+    with pytest.raises(ValueError):
+        ctx.pop_frame()
+
+
+def test_pop_frame_frees_variable_slots():
+    ctx = Context(max_vars=1)
+    with ctx.frame({"tmp": 1}):
+        pass
+    ctx.set("kept", 1)
+    ctx.delete("kept")
+    ctx.set("other", 2)
+    assert ctx.variables == {"other": 2}
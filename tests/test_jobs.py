@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from executor.jobs import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(tmp_path / "jobs.db")
+
+
+def expire_lease(queue, job_id):
+    with queue._connect() as conn:
+        conn.execute("UPDATE jobs SET lease_expires = ? WHERE id = ?", (time.time() - 1, job_id))
+
+
+def test_claim_is_exclusive(queue):
+    job_id = queue.submit("seek", "bots/seek.json")
+
+    job = queue.claim("w1")
+    assert job["id"] == job_id
+    assert job["status"] == "running"
+    assert job["worker_id"] == "w1"
+    assert queue.claim("w2") is None
+
+
+def test_claim_skips_bots_already_running(queue):
+    queue.submit("seek", "bots/seek.json")
+    queue.submit("seek", "bots/seek.json")
+    other_id = queue.submit("deknil", "bots/deknil.json")
+
+    assert queue.claim("w1")["bot_name"] == "seek"
+    assert queue.claim("w2")["id"] == other_id
+    assert queue.claim("w3") is None
+
+
+def test_expired_lease_is_requeued(queue):
+    job_id = queue.submit("seek", "bots/seek.json")
+    queue.claim("w1")
+    expire_lease(queue, job_id)
+
+    assert queue.requeue_expired() == 1
+    assert queue.get(job_id)["status"] == "queued"
+    assert queue.heartbeat(job_id, "w1") == (False, None)
+
+    job = queue.claim("w2")
+    assert job["id"] == job_id
+    assert job["attempts"] == 2
+
+
+def test_job_fails_when_attempts_are_used_up(queue):
+    job_id = queue.submit("seek", "bots/seek.json", max_attempts=2)
+    for worker_id in ("w1", "w2"):
+        assert queue.claim(worker_id)["id"] == job_id
+        expire_lease(queue, job_id)
+        queue.requeue_expired()
+
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 2
+    assert queue.claim("w3") is None
+
+
+def test_heartbeat_delivers_control_once(queue):
+    job_id = queue.submit("seek", "bots/seek.json")
+    queue.claim("w1")
+
+    assert queue.request_control(job_id, "pause")
+    assert queue.heartbeat(job_id, "w1") == (True, "pause")
+    assert queue.heartbeat(job_id, "w1") == (True, None)
+    assert queue.heartbeat(job_id, "w2") == (False, None)
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+import data.seen as seen_module
+from data.context import Context
+from data.seen import SeenIndex, key_hash
+from executor.conditions import all_items_seen, item_seen
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SeenIndex(tmp_path / "seen.db")
+
+
+def test_key_hash_accepts_numbers():
+    assert key_hash(123) == key_hash("123") == key_hash(" 123 ")
+
+
+def test_mark_and_seen(index):
+    assert not index.seen("bot", "https://a/1")
+    assert index.mark("bot", ["https://a/1", "https://a/2", "", None]) == 2
+    assert index.mark("bot", "https://a/1") == 0
+    assert index.seen("bot", "https://a/1")
+    assert not index.seen("other", "https://a/1")
+    assert index.mark("bot", 42) == 1
+    assert index.seen("bot", "42")
+
+
+def test_seen_all_uses_one_connection(index, monkeypatch):
+    keys = [f"https://a/{i}" for i in range(seen_module.SQL_IN_CHUNK * 2 + 7)]
+    index.mark("bot", keys)
+
+    connects = []
+    real_connect = index._connect
+    monkeypatch.setattr(index, "_connect", lambda: connects.append(1) or real_connect())
+
+    assert index.seen_all("bot", keys)
+    assert len(connects) == 1
+    assert not index.seen_all("bot", keys + ["https://a/new"])
+    assert not index.seen_all("bot", [])
+
+
+def test_refresh_picks_up_other_processes(tmp_path):
+    reader, writer = SeenIndex(tmp_path / "seen.db"), SeenIndex(tmp_path / "seen.db")
+    assert not reader.seen("bot", "x")  # builds the reader's filter
+    writer.mark("bot", "x")
+    reader.refresh()
+    assert reader.seen("bot", "x")
+
+
+def test_item_seen_condition_with_int_key(index, monkeypatch):
+    monkeypatch.setattr(seen_module, "_seen_index", index)
+    context = Context()
+    context.data["bot_name"] = "bot"
+    index.mark("bot", [123, 456])
+
+    assert asyncio.run(item_seen(None, context, key=123))
+    assert asyncio.run(item_seen(None, context, key=[123, 456]))
+    assert not asyncio.run(item_seen(None, context, key=789))
+    assert not asyncio.run(all_items_seen(None, context, conditional_parameter=[]))
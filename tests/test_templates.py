@@ -0,0 +1,41 @@
+from data.context import Context
+from executor.templates import CompiledState, Template, compile_value
+
+
+def test_single_placeholder_keeps_type():
+    ctx = Context({"n": 3})
+    assert Template("{{n}}").render(ctx) == 3
+    assert Template("{{ missing | 5 }}").render(ctx) == "5"
+    assert Template("{{missing}}").render(ctx) == ""
+
+
+def test_mixed_template_renders_string():
+    ctx = Context({"keyword": "python", "n": 2})
+    assert Template("{{keyword}} jobs p{{n}} {{city|Sydney}}").render(ctx) == "python jobs p2 Sydney"
+
+
+def test_dotted_names_stay_literal():
+    compiled, dynamic = compile_value("{{job.url}}")
+    assert not dynamic
+    assert compiled == "{{job.url}}"
+
+
+def test_compiled_state_renders_fields_and_transitions():
+    state = {
+        "id": "s1", "action": "fill", "value": "{{term}}", "selectors": ["#q"],
+        "with_vars": {"term": "{{keyword}} remote"},
+        "transitions": [{"condition": "url_contains", "conditional_parameter": "{{keyword}}", "next": "s2"}],
+    }
+    compiled = CompiledState(state)
+    ctx = Context({"keyword": "python"})
+    with ctx.frame(compiled.render_with_vars(ctx)):
+        rendered = compiled.render(ctx)
+        transitions = list(compiled.render_transitions(ctx))
+    assert rendered["value"] == "python remote"
+    assert rendered["selectors"] is state["selectors"]
+    assert transitions == [("url_contains", "s2", {"conditional_parameter": "python"})]
+
+
+def test_static_state_is_not_copied():
+    state = {"id": "s1", "action": "click", "selectors": ["#go"]}
+    assert CompiledState(state).render(Context()) is state
@@ -27,7 +27,16 @@
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(payload)
     });
-    return res.json();
+    return { status: res.status, ...(await res.json()) };
+  }
+  
+  async function patchBot(file, revision, ops) {
+    const res = await fetch(`/api/bots/${encodeURIComponent(file)}`, {
+      method: 'PATCH',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ revision, ops })
+    });
+    return { status: res.status, ...(await res.json()) };
   }
   
   async function deleteBot(file) {
@@ -76,6 +85,7 @@
     fetchBot,
     loadBotFile,
     saveBot,
+    patchBot,
     deleteBot,
     startBotAPI,
     stopBotAPI,
@@ -11,6 +11,9 @@ export class AppController {
         this.botController = new BotController(apiModule); // Add this line
         this.currentView = 'table';
         this.autoSaveTimeout = null;
+        this.savedSnapshot = null;   // last state of the bot the server has acknowledged
+        this.saveInFlight = false;
+        this.savePending = false;
         this.stateIndex = 0; // Global state index from original
 
         // Configuration
@@ -154,6 +157,8 @@ export class AppController {
         try {
             const bot = await this.api.loadBotFile(fileName);
             this.stateManager.setStateData(bot);
+            this.markSaved(bot);
+            this.saveBlocked = false;
             
             // Bot start Stop
             this.botController.setCurrentBot(fileName);
@@ -341,18 +346,103 @@ export class AppController {
         if (!stateData.file_name) return; // Don't auto-save if no file loaded
     
         clearTimeout(this.autoSaveTimeout);
-        this.autoSaveTimeout = setTimeout(async () => {
-            try {
-                // Bot name is no longer modified here
-                const result = await this.api.saveBot(stateData);
-                if (!result.error) {
-                    this.updateStatus('Auto-saved ✓');
-                }
-            } catch (error) {
-                console.error('Auto-save failed:', error);
+        this.autoSaveTimeout = setTimeout(() => this.flushSave(), 100);
+    }
+
+    // Send only what changed since the last acknowledged save; one request at a time
+    async flushSave() {
+        if (this.saveBlocked) return; // conflict pending: don't overwrite the other copy
+        if (this.saveInFlight) {
+            this.savePending = true;
+            return;
+        }
+        const stateData = this.stateManager.getStateData();
+        // Copy what we send so edits made while the request is in flight are diffed next time
+        const sent = JSON.parse(JSON.stringify(stateData));
+        const ops = this.diffAgainstSaved(sent);
+        if (ops.length === 0) return;
+
+        this.saveInFlight = true;
+        try {
+            const result = ops === 'full'
+                ? await this.api.saveBot({ ...sent, revision: sent.revision ?? 0 })
+                : await this.api.patchBot(sent.file_name, sent.revision, ops);
+            if (result.status === 409 || result.status === 404) {
+                // Someone else changed the file (or it's gone): stop auto-saving rather than clobber it
+                this.handleSaveConflict(sent.file_name, result.status);
+            } else if (!result.error) {
+                stateData.revision = sent.revision = result.revision;
+                this.markSaved(sent);
+                this.updateStatus('Auto-saved ✓');
             }
-        }, 100);
-    }    
+        } catch (error) {
+            console.error('Auto-save failed:', error);
+        } finally {
+            this.saveInFlight = false;
+            if (this.savePending) {
+                this.savePending = false;
+                this.flushSave();
+            }
+        }
+    }
+
+    async handleSaveConflict(fileName, status) {
+        this.saveBlocked = true;
+        this.savePending = false;
+        if (status === 404) {
+            this.updateStatus('⚠️ Not saved: this bot was deleted elsewhere');
+            return;
+        }
+        this.updateStatus('⚠️ Not saved: this bot was changed elsewhere');
+        if (confirm('This bot was changed in another window or by another user.\n\n'
+            + 'Reload the latest version? Your unsaved edits will be lost.')) {
+            await this.loadBotForEditing(fileName);
+        }
+    }
+
+    markSaved(bot) {
+        const { states, ...fields } = bot;
+        this.savedSnapshot = {
+            fields: JSON.stringify({ ...fields, revision: undefined }),
+            order: (states || []).map(s => s.id),
+            states: new Map((states || []).map(s => [s.id, JSON.stringify(s)]))
+        };
+    }
+
+    // Returns a list of patch ops, or 'full' when a whole-file save is needed
+    diffAgainstSaved(bot) {
+        const saved = this.savedSnapshot;
+        if (!saved || bot.revision === undefined) return 'full';
+
+        const ops = [];
+        const { states = [], ...fields } = bot;
+        const currentFields = JSON.stringify({ ...fields, revision: undefined });
+        if (currentFields !== saved.fields) {
+            const { revision, ...changed } = fields;
+            ops.push({ op: 'set', fields: changed });
+        }
+
+        const currentIds = new Set(states.map(s => s.id));
+        saved.order.filter(id => !currentIds.has(id))
+            .forEach(id => ops.push({ op: 'remove_state', id }));
+
+        states.forEach((state, index) => {
+            const json = JSON.stringify(state);
+            if (!saved.states.has(state.id)) {
+                ops.push({ op: 'add_state', state, index });
+            } else if (saved.states.get(state.id) !== json) {
+                ops.push({ op: 'set_state', id: state.id, state });
+            }
+        });
+
+        const order = states.map(s => s.id);
+        const expected = saved.order.filter(id => currentIds.has(id));
+        states.forEach((s, i) => { if (!saved.states.has(s.id)) expected.splice(i, 0, s.id); });
+        if (order.join('\u0000') !== expected.join('\u0000')) {
+            ops.push({ op: 'reorder', order });
+        }
+        return ops;
+    }
 
     // Utility methods
     updateStatus(msg) {
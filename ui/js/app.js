@@ -4,6 +4,7 @@ import {
     fetchBot,
     loadBotFile,
     saveBot,
+    patchBot,
     deleteBot,
     fetchActions,
     fetchConditions
@@ -17,6 +18,7 @@ window.apiModule = {
     fetchBot,
     loadBotFile,
     saveBot,
+    patchBot,
     deleteBot,
     fetchActions,
     fetchConditions